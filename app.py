@@ -1,6 +1,340 @@
-from flask import Flask, jsonify, request, abort
+from flask import Flask, Response, jsonify, redirect, request, abort, stream_with_context
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import ast
+import atexit
+import hashlib
+import math
+import operator
+import os
+import sys
+import threading
+from urllib.parse import parse_qsl, urlencode
+import numpy as np
+from json_provider import FastJSONProvider
+from response_cache import ResultCache
  
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+app.config.from_mapping(
+    RESULT_CACHE_MAX_ENTRIES=4096,
+    RESULT_CACHE_MAX_BYTES=32 * 1024 * 1024,
+    RESULT_CACHE_TTL=None,
+    HTTP_CACHE_MAX_AGE=365 * 24 * 60 * 60,
+    CANONICAL_REDIRECT=False,
+    WSGI_FAST_PATH=False,
+    ADMISSION_MAX_COST=1_000_000,
+    OFFLOAD_MIN_COST=4_096,
+    OFFLOAD_WORKERS=None,
+    OFFLOAD_MAX_PENDING=None,
+    OFFLOAD_TIMEOUT=5.0,
+    BATCH_OFFLOAD_MIN_ITEMS=10_000,
+)
+# Overrides come from FLASK_-prefixed environment variables,
+# e.g. FLASK_RESULT_CACHE_TTL=300.
+app.config.from_prefixed_env()
+ 
+# --- Result Cache ---
+ 
+result_cache = ResultCache(
+    max_entries=app.config["RESULT_CACHE_MAX_ENTRIES"],
+    max_bytes=app.config["RESULT_CACHE_MAX_BYTES"],
+    ttl=app.config["RESULT_CACHE_TTL"],
+)
+
+
+# Query parameter names per operation, in canonical order.
+OPERAND_NAMES = {
+    "add": ("a", "b"),
+    "subtract": ("a", "b"),
+    "multiply": ("a", "b"),
+    "divide": ("a", "b"),
+    "cube": ("x",),
+}
+COMMUTATIVE_OPERATIONS = {"add", "multiply"}
+
+
+def _calculate(operation, a, b=None):
+    """Applies a single arithmetic operation, mirroring the GET endpoints."""
+    if operation == "add":
+        return {"result": a + b}
+    if operation == "subtract":
+        return {"result": a - b}
+    if operation == "multiply":
+        return {"result": a * b}
+    if operation == "divide":
+        if b == 0:
+            return {"error": "Division by zero is not allowed"}
+        return {"result": a / b}
+    if operation == "cube":
+        return {"result": a ** 3}
+    return {"error": f"'operation' must be one of: {', '.join(OPERAND_NAMES)}"}
+
+
+def _canonical_key(operation, *operands):
+    """Builds the cache key shared by every textual variant of the same computation.
+
+    Operands are already parsed ints, so '07', '+7' and '7' coincide and the
+    order of query parameters is irrelevant; commutative operations also sort
+    their operands so that a=6&b=7 and a=7&b=6 share one entry.
+    """
+    if operation in COMMUTATIVE_OPERATIONS:
+        operands = sorted(operands)
+    return (operation, *operands)
+
+
+def _canonical_query(key):
+    return urlencode(list(zip(OPERAND_NAMES[key[0]], key[1:])))
+
+
+def _result_payload(key):
+    """Computes the response payload for a canonical key."""
+    operation, *operands = key
+    if operation == "area":
+        return {"result": operands[0] * operands[1], "units": "square units"}
+    return _calculate(operation, *operands)
+
+
+def _encode_result(key):
+    """Computes and serializes the result for key; also runs inside pool workers."""
+    return app.json.response_bytes(_result_payload(key))
+
+
+# Bump when the encoding of results changes so clients drop old validators.
+RESULT_ETAG_VERSION = b"1"
+
+
+def _result_etag(key):
+    """Derives a strong ETag from the canonical input, without computing the result."""
+    digest = hashlib.blake2b(RESULT_ETAG_VERSION, digest_size=16)
+    for part in key:
+        if isinstance(part, int):
+            part = part.to_bytes(part.bit_length() // 8 + 1, "big", signed=True)
+        else:
+            part = part.encode()
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _cached_result(key):
+    """Returns the JSON response for key, computing and encoding it only on a cache miss.
+
+    With CANONICAL_REDIRECT enabled, GETs whose query string is not the
+    canonical spelling of key are redirected there so proxies see one URL.
+    GET responses are deterministic for a given key, so they also carry a
+    strong ETag and a long-lived immutable Cache-Control header, and a
+    matching If-None-Match is answered with 304 before any work is done.
+    Cache misses go through admission control: results too large to encode
+    and computations over the cost budget are rejected with 413.
+    """
+    cacheable = request.method == "GET"
+    if cacheable and app.config["CANONICAL_REDIRECT"]:
+        query = _canonical_query(key)
+        if request.query_string.decode("latin-1") != query:
+            return redirect(f"{request.path}?{query}", code=301)
+    if cacheable:
+        etag = _result_etag(key)
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            return _add_http_cache_headers(response, etag)
+
+    body = result_cache.get(key)
+    if body is None:
+        if _result_too_large(key):
+            return jsonify({"error": "Result too large: it exceeds the digits the API can return"}), 413
+        cost = _estimate_cost(key)
+        if cost > app.config["ADMISSION_MAX_COST"]:
+            return jsonify({"error": "Operands too large: estimated cost exceeds the configured budget"}), 413
+        if cost < app.config["OFFLOAD_MIN_COST"]:
+            body = _encode_result(key)
+        else:
+            body = _run_offloaded(_encode_result, key)
+        result_cache.set(key, body)
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    return _add_http_cache_headers(response, etag) if cacheable else response
+
+
+def _add_http_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config["HTTP_CACHE_MAX_AGE"]
+    response.cache_control.immutable = True
+    return response
+
+# --- Admission Control ---
+
+_LOG10_2 = math.log10(2)
+# |a / b| rounds to infinity from here on: the float maximum plus half an ulp.
+_FLOAT_OVERFLOW = 2 ** 1024 - 2 ** 970
+
+
+def _max_result_bits():
+    """Bit length above which CPython may refuse to write an int as decimal text (None: no limit)."""
+    digits = sys.get_int_max_str_digits()
+    return int((digits - 1) / _LOG10_2) if digits else None
+
+
+def _result_too_large(key):
+    """Tells, without computing it, whether the result for key can't be written as JSON.
+
+    Integer results are bounded from their operands' bit lengths and checked
+    against the interpreter's int-to-str digit limit; true division only
+    fails when the quotient overflows a float.
+    """
+    operation, *operands = key
+    if operation == "divide":
+        a, b = operands
+        return b != 0 and abs(a) >= abs(b) * _FLOAT_OVERFLOW
+    max_bits = _max_result_bits()
+    if max_bits is None:
+        return False
+    bits = [abs(v).bit_length() for v in operands]
+    if operation in ("multiply", "area"):
+        result_bits = bits[0] + bits[1]
+    elif operation == "cube":
+        result_bits = 3 * bits[0]
+    else:
+        result_bits = max(bits) + 1
+    return result_bits > max_bits
+
+
+def _estimate_cost(key):
+    """Estimates the work for a canonical key, in 64-bit limb operations.
+
+    Multiplication is charged as limbs(a) * limbs(b) (an upper bound for
+    CPython's schoolbook/Karatsuba mix) and the decimal conversion done by
+    the JSON encoder as the square of the result's limb count.
+    """
+    operation, *operands = key
+    limbs = [abs(v).bit_length() // 64 + 1 for v in operands]
+    if operation in ("multiply", "area"):
+        work, result_limbs = limbs[0] * limbs[1], limbs[0] + limbs[1]
+    elif operation == "cube":
+        work, result_limbs = 3 * limbs[0] ** 2, 3 * limbs[0]
+    elif operation == "divide":
+        # True division produces a float; the result is always small.
+        work, result_limbs = sum(limbs), 1
+    else:
+        work, result_limbs = sum(limbs), max(limbs) + 1
+    return work + result_limbs ** 2
+
+
+# --- Process Pool Offload ---
+#
+# CPU-bound work (big-integer results, large batches) runs in a process pool
+# so it neither holds the GIL of the serving worker nor blocks its threads.
+
+class OffloadBusy(Exception):
+    """Raised when every slot of the offload pool is already taken."""
+
+
+class OffloadTimeout(Exception):
+    """Raised when an offloaded task misses its deadline."""
+
+
+class OffloadFailed(Exception):
+    """Raised when a pool worker died (e.g. was OOM-killed) before finishing a task."""
+
+
+_offload_pool = None
+_offload_slots = None
+_offload_pid = None
+_offload_lock = threading.Lock()
+
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _get_offload_pool():
+    """Creates the process pool on first use, and again in each forked worker."""
+    global _offload_pool, _offload_slots, _offload_pid
+    with _offload_lock:
+        # A pool inherited through fork (e.g. gunicorn --preload) has no
+        # usable worker processes in the child, so each process owns its own.
+        if _offload_pool is None or _offload_pid != os.getpid():
+            workers = app.config["OFFLOAD_WORKERS"] or _available_cores()
+            pending = app.config["OFFLOAD_MAX_PENDING"] or 2 * workers
+            _offload_pool = ProcessPoolExecutor(max_workers=workers)
+            _offload_slots = threading.BoundedSemaphore(pending)
+            _offload_pid = os.getpid()
+        return _offload_pool, _offload_slots
+
+
+def _discard_offload_pool(pool):
+    """Drops a broken pool so the next offloaded task starts a new one."""
+    global _offload_pool
+    with _offload_lock:
+        if _offload_pool is pool:
+            _offload_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _shutdown_offload_pool():
+    with _offload_lock:
+        if _offload_pool is not None and _offload_pid == os.getpid():
+            _offload_pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_offload_pool)
+
+
+def _run_offloaded(fn, *args, timeout=None):
+    """Runs fn(*args) in the process pool and returns its result.
+
+    Waits at most timeout seconds (OFFLOAD_TIMEOUT by default); on expiry the
+    task is cancelled if it has not started yet. A slot is held until the task
+    actually finishes, even when the caller gave up on it, so abandoned work
+    still counts against the bound. If a worker process dies, the pool is
+    replaced and OffloadFailed is raised.
+    """
+    pool, slots = _get_offload_pool()
+    if not slots.acquire(blocking=False):
+        raise OffloadBusy()
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _discard_offload_pool(pool)
+        raise OffloadFailed()
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    if timeout is None:
+        timeout = app.config["OFFLOAD_TIMEOUT"]
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise OffloadTimeout()
+    except BrokenProcessPool:
+        _discard_offload_pool(pool)
+        raise OffloadFailed()
+
+
+@app.errorhandler(OffloadBusy)
+def offload_busy(e):
+    response = jsonify({"error": "Too many expensive computations in progress"})
+    response.headers["Retry-After"] = "1"
+    return response, 429
+
+
+@app.errorhandler(OffloadTimeout)
+def offload_timeout(e):
+    return jsonify({"error": "Computation exceeded its deadline"}), 503
+
+
+@app.errorhandler(OffloadFailed)
+def offload_failed(e):
+    response = jsonify({"error": "Computation failed, please retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
  
 # --- Arithmetic Services (GET with Query Parameters) ---
  
@@ -17,7 +351,7 @@ def add_numbers():
     try:
         a = int(request.args.get("a", 0))
         b = int(request.args.get("b", 0))
-        return jsonify({"result": a + b})
+        return _cached_result(_canonical_key("add", a, b))
     except ValueError:
         return jsonify({"error": "Invalid input: 'a' and 'b' must be integers"}), 400
  
@@ -29,7 +363,7 @@ def subtract_numbers():
     try:
         a = int(request.args.get("a", 0))
         b = int(request.args.get("b", 0))
-        return jsonify({"result": a - b})
+        return _cached_result(_canonical_key("subtract", a, b))
     except ValueError:
         return jsonify({"error": "Invalid input: 'a' and 'b' must be integers"}), 400
  
@@ -41,7 +375,7 @@ def multiply_numbers():
     try:
         a = int(request.args.get("a", 0))
         b = int(request.args.get("b", 0))
-        return jsonify({"result": a * b})
+        return _cached_result(_canonical_key("multiply", a, b))
     except ValueError:
         return jsonify({"error": "Invalid input: 'a' and 'b' must be integers"}), 400
 
@@ -57,7 +391,7 @@ def divide_numbers():
         if b == 0:
             return jsonify({"error": "Division by zero is not allowed"}), 400
  
-        return jsonify({"result": a / b})
+        return _cached_result(_canonical_key("divide", a, b))
     except ValueError:
         return jsonify({"error": "Invalid input: 'a' and 'b' must be integers"}), 400
 
@@ -68,7 +402,7 @@ def cube_number():
     # How to call: http://127.0.0.1:5000/cube?x=3
     try:
         x = int(request.args.get("x", 0))
-        return jsonify({"result": x ** 3})
+        return _cached_result(_canonical_key("cube", x))
     except ValueError:
         return jsonify({"error": "Invalid input: 'x' must be an integer"}), 400
 
@@ -86,19 +420,473 @@ def calculate_area():
     try:
         width = int(data['width'])
         height = int(data['height'])
-        area = width * height
-        return jsonify({"result": area, "units": "square units"})
+        return _cached_result(("area", width, height))
     except ValueError:
         return jsonify({"error": "Width and height must be integers"}), 400
     except Exception:
         return jsonify({"error": "Invalid JSON format"}), 400
 
+# 11. Batch Arithmetic (POST with JSON) - NEW
+BATCH_MAX_ITEMS = 100_000
+BATCH_OPERATIONS = ("add", "subtract", "multiply", "divide", "cube")
+
+# Operands whose results stay within these bit lengths are computed on int64
+# arrays; anything larger falls back to exact Python ints (object arrays).
+_INT64_SAFE_BITS = 62
+_FLOAT64_EXACT_BITS = 53
+
+
+def _parse_operand(value):
+    """Converts one JSON operand to an int; floats and booleans are rejected, not truncated."""
+    if isinstance(value, (bool, float)):
+        raise TypeError(value)
+    return int(value)
+
+
+def _parse_operands(values):
+    """Converts a list of raw operands to ints, returning (ints, errors by index)."""
+    operands, errors = [], {}
+    for i, value in enumerate(values):
+        try:
+            operands.append(_parse_operand(value))
+        except (TypeError, ValueError):
+            operands.append(0)
+            errors[i] = "Invalid input: operands must be integers"
+    return operands, errors
+
+
+def _operand_array(operands, max_bits):
+    """Builds an int64 array when every operand fits in max_bits, else an object array."""
+    if all(abs(v).bit_length() <= max_bits for v in operands):
+        return np.array(operands, dtype=np.int64)
+    return np.array(operands, dtype=object)
+
+
+def _vectorized(operation, a, b):
+    """Computes operation over whole operand lists in one NumPy pass."""
+    if operation == "cube":
+        x = _operand_array(a, _INT64_SAFE_BITS // 3)
+        return x * x * x, {}
+    if operation == "divide":
+        errors = {i: "Division by zero is not allowed" for i, v in enumerate(b) if v == 0}
+        x = _operand_array(a, _FLOAT64_EXACT_BITS)
+        y = _operand_array([v or 1 for v in b], _FLOAT64_EXACT_BITS)
+        if x.dtype == object or y.dtype == object:
+            x, y = x.astype(object), y.astype(object)
+        return x / y, errors
+    bits = _INT64_SAFE_BITS // 2 if operation == "multiply" else _INT64_SAFE_BITS - 1
+    x, y = _operand_array(a, bits), _operand_array(b, bits)
+    if x.dtype == object or y.dtype == object:
+        x, y = x.astype(object), y.astype(object)
+    if operation == "add":
+        return x + y, {}
+    if operation == "subtract":
+        return x - y, {}
+    return x * y, {}
+
+
+@app.route("/batch", methods=["POST"])
+def batch_calculate():
+    """Applies one operation to many operands in a single vectorized pass."""
+    # How to call:
+    # curl -X POST -H "Content-Type: application/json" -d '{"operation": "add", "a": [1, 2], "b": [3, 4]}' http://127.0.0.1:5000/batch
+    # curl -X POST -H "Content-Type: application/json" -d '{"operation": "cube", "x": [1, 2, 3]}' http://127.0.0.1:5000/batch
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or data.get("operation") not in BATCH_OPERATIONS:
+        return jsonify({"error": f"'operation' must be one of: {', '.join(BATCH_OPERATIONS)}"}), 400
+
+    operation = data["operation"]
+    if operation == "cube":
+        raw_a = data.get("x")
+        raw_b = raw_a
+    else:
+        raw_a, raw_b = data.get("a"), data.get("b")
+
+    if not isinstance(raw_a, list) or not isinstance(raw_b, list):
+        expected = "'x'" if operation == "cube" else "'a' and 'b'"
+        return jsonify({"error": f"Missing {expected} arrays in JSON body"}), 400
+    if len(raw_a) != len(raw_b):
+        return jsonify({"error": "'a' and 'b' must have the same length"}), 400
+    if len(raw_a) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Batch exceeds {BATCH_MAX_ITEMS} items"}), 413
+
+    a, b, errors, cost = _prepare_batch(operation, raw_a, raw_b)
+    if cost > app.config["ADMISSION_MAX_COST"]:
+        return jsonify({"error": "Operands too large: estimated cost exceeds the configured budget"}), 413
+    if len(a) < app.config["BATCH_OFFLOAD_MIN_ITEMS"] and cost < app.config["OFFLOAD_MIN_COST"]:
+        body = _encode_batch(operation, a, b, errors)
+    else:
+        body = _run_offloaded(_encode_batch, operation, a, b, errors)
+    return app.response_class(body, mimetype=app.json.mimetype)
+
+
+def _prepare_batch(operation, raw_a, raw_b):
+    """Parses a batch and vets its big-integer elements.
+
+    Returns the operands, the errors by index and the estimated cost of the
+    elements that need exact big-integer arithmetic. Elements whose result
+    couldn't be returned are reported as errors instead of being computed.
+    """
+    a, errors = _parse_operands(raw_a)
+    b, b_errors = _parse_operands(raw_b)
+    for i, message in b_errors.items():
+        errors.setdefault(i, message)
+
+    cost = 0
+    for i, (x, y) in enumerate(zip(a, b)):
+        if i in errors or max(abs(x).bit_length(), abs(y).bit_length()) <= _INT64_SAFE_BITS:
+            continue
+        key = (operation, x) if operation == "cube" else (operation, x, y)
+        if _result_too_large(key):
+            errors[i] = "Result too large: it exceeds the digits the API can return"
+        else:
+            cost += _estimate_cost(key)
+
+    # Failed elements are replaced so the pass stays vectorized; make sure
+    # they can't trigger big-integer work or a division by zero of their own.
+    for i in errors:
+        a[i], b[i] = 0, 1
+    return a, b, errors, cost
+
+
+def _encode_batch(operation, a, b, errors):
+    """Computes and serializes a prepared batch; also runs inside pool workers."""
+    values, op_errors = _vectorized(operation, a, b)
+    errors = {**errors, **op_errors}
+
+    results = [
+        {"error": errors[i]} if i in errors else {"result": value}
+        for i, value in enumerate(values.tolist())
+    ]
+    return app.json.response_bytes({"operation": operation, "results": results, "errors": len(errors)})
+
+# 12. Streaming Arithmetic (POST with NDJSON) - NEW
+def _calculate_line(line):
+    """Parses one NDJSON operation line and computes its result."""
+    try:
+        data = app.json.loads(line)
+    except ValueError:
+        return {"error": "Invalid JSON line"}
+    if not isinstance(data, dict):
+        return {"error": "Each line must be a JSON object"}
+
+    operation = data.get("operation")
+    if operation not in OPERAND_NAMES:
+        return _calculate(operation, 0, 0)
+    try:
+        operands = [_parse_operand(data.get(name, 0)) for name in OPERAND_NAMES[operation]]
+    except (TypeError, ValueError):
+        return {"error": "Invalid input: operands must be integers"}
+    # Checked up front: a failure inside the generator would cut the stream short.
+    key = (operation, *operands)
+    if _result_too_large(key):
+        return {"error": "Result too large: it exceeds the digits the API can return"}
+    if _estimate_cost(key) > app.config["ADMISSION_MAX_COST"]:
+        return {"error": "Operands too large: estimated cost exceeds the configured budget"}
+    return _calculate(*key)
+
+
+@app.route("/stream", methods=["POST"])
+def stream_calculate():
+    """Computes a newline-delimited JSON stream of operations, one result line per input line."""
+    # How to call:
+    # printf '{"operation": "add", "a": 1, "b": 2}\n{"operation": "cube", "x": 3}\n' | \
+    #   curl -X POST -H "Content-Type: application/x-ndjson" -T - http://127.0.0.1:5000/stream
+    def generate():
+        # request.stream is read lazily, line by line, while results are
+        # written out, so neither side of the exchange is buffered in full.
+        for line in request.stream:
+            if line.strip():
+                yield app.json.dumps(_calculate_line(line)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# 13. Expression Evaluation (POST with JSON) - NEW
+EVAL_MAX_LENGTH = 1000
+EVAL_MAX_EXPONENT = 10_000
+EVAL_CACHE_SIZE = 256
+# Bound on intermediate integers when the interpreter has no int-to-str digit limit.
+EVAL_MAX_INT_BITS = 1 << 16
+# Deeper operator nesting is rejected while compiling, since compiling and
+# evaluating both recurse once per level.
+EVAL_MAX_DEPTH = 100
+
+
+class EvalOverBudget(Exception):
+    """Raised when the next operation would take the evaluation over its cost budget."""
+
+
+class _EvalMeter:
+    """Charges each operation's estimated cost, before it runs, against a budget."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.spent = 0
+        self.max_bits = _max_result_bits() or EVAL_MAX_INT_BITS
+
+    def charge(self, cost, result_bits=0):
+        if result_bits > self.max_bits:
+            raise OverflowError(result_bits)
+        self.spent += cost
+        if self.spent > self.budget:
+            raise EvalOverBudget()
+
+
+def _limbs(value):
+    return abs(value).bit_length() // 64 + 1 if isinstance(value, int) else 1
+
+
+def _bits(value):
+    return abs(value).bit_length() if isinstance(value, int) else 0
+
+
+def _eval_add(a, b, meter):
+    meter.charge(max(_limbs(a), _limbs(b)), max(_bits(a), _bits(b)) + 1)
+    return a + b
+
+
+def _eval_sub(a, b, meter):
+    meter.charge(max(_limbs(a), _limbs(b)), max(_bits(a), _bits(b)) + 1)
+    return a - b
+
+
+def _eval_mul(a, b, meter):
+    meter.charge(_limbs(a) * _limbs(b), _bits(a) + _bits(b))
+    return a * b
+
+
+def _eval_div(a, b, meter):
+    meter.charge(_limbs(a) + _limbs(b))
+    return a / b
+
+
+def _eval_pow(base, exponent, meter):
+    if abs(exponent) > EVAL_MAX_EXPONENT:
+        raise ValueError(f"Exponent magnitude must not exceed {EVAL_MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        # The result has between (bits - 1) * exponent + 1 and bits * exponent
+        # bits. Repeated squaring costs about limbs(result)^2, charged for the
+        # upper bound; the size limit is checked against the lower bound now
+        # and against the actual result below.
+        most_bits = _bits(base) * exponent
+        meter.charge((most_bits // 64 + 1) ** 2, (_bits(base) - 1) * exponent + 1)
+        result = base ** exponent
+        if _bits(result) > meter.max_bits:
+            raise OverflowError(_bits(result))
+        return result
+    meter.charge(1)
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ValueError("Expression has no real result")
+    return result
+
+
+_EVAL_BINARY_OPS = {
+    ast.Add: _eval_add,
+    ast.Sub: _eval_sub,
+    ast.Mult: _eval_mul,
+    ast.Div: _eval_div,
+    ast.Pow: _eval_pow,
+}
+_EVAL_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _finite(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        raise OverflowError(value)
+    return value
+
+
+def _compile_node(node, names, depth=0):
+    """Turns a whitelisted AST node into a closure over the variable bindings and a cost meter."""
+    if depth > EVAL_MAX_DEPTH:
+        raise ValueError("Expression is nested too deeply")
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = _finite(node.value)
+        return lambda env, meter: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.add(name)
+        return lambda env, meter: env[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _EVAL_BINARY_OPS:
+        op = _EVAL_BINARY_OPS[type(node.op)]
+        left, right = _compile_node(node.left, names, depth + 1), _compile_node(node.right, names, depth + 1)
+        return lambda env, meter: _finite(op(left(env, meter), right(env, meter), meter))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _EVAL_UNARY_OPS:
+        op = _EVAL_UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand, names, depth + 1)
+        return lambda env, meter: op(operand(env, meter))
+    raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=EVAL_CACHE_SIZE)
+def _compile_expression(expression):
+    """Parses and compiles an expression once; returns (evaluator, variable names)."""
+    # '^' is accepted as exponentiation; rewriting it to '**' (rather than
+    # mapping BitXor) keeps the usual precedence and right associativity.
+    try:
+        tree = ast.parse(expression.replace("^", "**"), mode="eval")
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # ValueError covers literals over the interpreter's int digit limit.
+        raise ValueError("Invalid expression syntax")
+    names = set()
+    return _compile_node(tree.body, names), frozenset(names)
+
+
+def _evaluate(expression, variables, budget):
+    """Evaluates a compiled expression within a cost budget; also runs inside pool workers."""
+    evaluator, _ = _compile_expression(expression)
+    return evaluator(variables, _EvalMeter(budget))
+
+
+@app.route("/eval", methods=["POST"])
+def evaluate_expression():
+    """Evaluates an arithmetic expression with variable bindings from the JSON body."""
+    # How to call:
+    # curl -X POST -H "Content-Type: application/json" -d '{"expression": "(a+b)*c^3", "variables": {"a": 1, "b": 2, "c": 3}}' http://127.0.0.1:5000/eval
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("expression"), str):
+        return jsonify({"error": "Missing 'expression' in JSON body"}), 400
+
+    expression = data["expression"]
+    variables = data.get("variables", {})
+    if len(expression) > EVAL_MAX_LENGTH:
+        return jsonify({"error": f"Expression exceeds {EVAL_MAX_LENGTH} characters"}), 400
+    if not isinstance(variables, dict) or not all(
+        type(value) is int or (type(value) is float and math.isfinite(value)) for value in variables.values()
+    ):
+        return jsonify({"error": "'variables' must map names to finite numbers"}), 400
+
+    try:
+        evaluator, names = _compile_expression(expression)
+        missing = names - variables.keys()
+        if missing:
+            return jsonify({"error": f"Missing variables: {', '.join(sorted(missing))}"}), 400
+        # Cheap expressions are evaluated inline; once the estimated cost
+        # passes OFFLOAD_MIN_COST the evaluation restarts in the process pool
+        # with the full admission budget.
+        try:
+            result = _evaluate(expression, variables, app.config["OFFLOAD_MIN_COST"])
+        except EvalOverBudget:
+            result = _run_offloaded(_evaluate, expression, variables, app.config["ADMISSION_MAX_COST"])
+        return jsonify({"result": result})
+    except EvalOverBudget:
+        return jsonify({"error": "Expression too expensive: estimated cost exceeds the configured budget"}), 413
+    except ZeroDivisionError:
+        return jsonify({"error": "Division by zero is not allowed"}), 400
+    except OverflowError:
+        return jsonify({"error": "Result is too large"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+# 14. Cache Statistics (GET) - NEW
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Reports hit/miss counters and sizes of the in-process caches."""
+    # How to call: http://127.0.0.1:5000/cache/stats
+    expressions = _compile_expression.cache_info()
+    return jsonify({
+        "results": result_cache.stats(),
+        "expressions": {
+            "entries": expressions.currsize,
+            "max_entries": expressions.maxsize,
+            "hits": expressions.hits,
+            "misses": expressions.misses,
+        },
+    })
+
 # 10. Health Check (GET) - NEW
 @app.route("/health", methods=["GET"])
 def health_check():
     """A standard endpoint to check if the API is running correctly."""
     # How to call: http://127.0.0.1:5000/health
     return jsonify({"status": "ok", "service": "calculator-api"}), 200
+
+# --- WSGI Fast Path ---
+
+class FastPathMiddleware:
+    """Serves the hottest GET routes straight from the WSGI environ.
+
+    Skips the Flask request context and URL routing for /, /health and the
+    arithmetic routes. Anything that can't be answered byte-for-byte as Flask
+    would (other methods and paths, conditional requests, invalid input,
+    redirects, debug mode, and cache misses that need admission control) is
+    passed to the wrapped app unchanged. Requests served here do not run
+    Flask's before/after request hooks.
+    """
+
+    def __init__(self, flask_app, wsgi_app):
+        self.flask_app = flask_app
+        self.wsgi_app = wsgi_app
+        self.routes = {
+            "/": self._hello,
+            "/health": self._health,
+            **{f"/{operation}": self._arithmetic for operation in OPERAND_NAMES},
+        }
+        self._health_body = None
+
+    def __call__(self, environ, start_response):
+        handler = self.routes.get(environ.get("PATH_INFO"))
+        if (
+            handler is not None
+            and environ.get("REQUEST_METHOD") == "GET"
+            and not self.flask_app.debug
+        ):
+            response = handler(environ)
+            if response is not None:
+                headers, body = response
+                headers.append(("Content-Length", str(len(body))))
+                start_response("200 OK", headers)
+                return [body]
+        return self.wsgi_app(environ, start_response)
+
+    def _hello(self, environ):
+        return [("Content-Type", "text/html; charset=utf-8")], b"Hello, CI/CD! This is a simple REST API."
+
+    def _health(self, environ):
+        if self._health_body is None:
+            self._health_body = self.flask_app.json.response_bytes(
+                {"status": "ok", "service": "calculator-api"}
+            )
+        return [("Content-Type", self.flask_app.json.mimetype)], self._health_body
+
+    def _arithmetic(self, environ):
+        if "HTTP_IF_NONE_MATCH" in environ:
+            return None
+        operation = environ["PATH_INFO"][1:]
+        query = environ.get("QUERY_STRING", "")
+        args = {}
+        for name, value in parse_qsl(query, keep_blank_values=True):
+            args.setdefault(name, value)
+        try:
+            operands = [int(args.get(name, 0)) for name in OPERAND_NAMES[operation]]
+        except ValueError:
+            return None
+        if operation == "divide" and operands[1] == 0:
+            return None
+
+        key = _canonical_key(operation, *operands)
+        config = self.flask_app.config
+        if config["CANONICAL_REDIRECT"] and query != _canonical_query(key):
+            return None
+        if _estimate_cost(key) >= config["OFFLOAD_MIN_COST"] or _result_too_large(key):
+            return None
+        body = result_cache.get(key)
+        if body is None:
+            body = _encode_result(key)
+            result_cache.set(key, body)
+        return [
+            ("Content-Type", self.flask_app.json.mimetype),
+            ("ETag", f'"{_result_etag(key)}"'),
+            ("Cache-Control", f"public, max-age={config['HTTP_CACHE_MAX_AGE']}, immutable"),
+        ], body
+
+
+if app.config["WSGI_FAST_PATH"]:
+    app.wsgi_app = FastPathMiddleware(app, app.wsgi_app)
  
 if __name__ == "__main__":
     app.run(debug=True, use_reloader=False)
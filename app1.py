@@ -1,7 +1,32 @@
-from flask import Flask, jsonify, request
-from supabase import create_client, Client
+from flask import Flask, Response, jsonify, request
+from supabase import create_client, Client, ClientOptions
+import atexit
+import httpx
+import math
 import os
+import threading
+import time
+from circuit_breaker import CircuitBreaker, CircuitOpen
 from dotenv import load_dotenv
+from json_provider import FastJSONProvider
+from todo_replica import ReplicaUnavailable, TodoReplica, start_realtime_feed
+from todo_repository import GuardedTodoRepository, SQLiteTodoRepository, SupabaseTodoRepository
+from write_behind import QueueFull, WriteBehindBuffer
+from todo_responses import cache_payload, conditional_response, create_todo_cache, invalidate_todos, store_error
+from todo_queries import (
+    BULK_INSERT_CHUNK_SIZE,
+    BULK_MAX_ITEMS,
+    DEFAULT_TODO_QUERY,
+    TODOS_MAX_PAGE_SIZE,
+    TODOS_PAGE_SIZE,
+    build_todo_record,
+    decode_cursor,
+    encode_cursor,
+    is_client_error,
+    parse_bulk_selection,
+    parse_todo_query,
+    query_key,
+)
  
 load_dotenv()
  
@@ -9,10 +34,225 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# HTTP connection pool used for all Supabase calls of a process.
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "false").lower() in ("1", "true", "yes")
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+# The Supabase client is created lazily, once per process: gunicorn workers
+# forked from a --preload master must not share the master's connections.
+_supabase_client = None
+_supabase_lock = threading.Lock()
+
+
+def _forget_supabase_client():
+    global _supabase_client, _supabase_lock
+    _supabase_client = None
+    _supabase_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_supabase_client)
+
+
+def get_supabase() -> Client:
+    """Returns this process's Supabase client, creating it on first use."""
+    global _supabase_client
+    if _supabase_client is None:
+        with _supabase_lock:
+            if _supabase_client is None:
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=SUPABASE_MAX_CONNECTIONS,
+                        max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+                        keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+                    ),
+                    http2=SUPABASE_HTTP2,
+                    timeout=SUPABASE_TIMEOUT,
+                )
+                _supabase_client = create_client(
+                    SUPABASE_URL, SUPABASE_KEY, ClientOptions(httpx_client=http_client)
+                )
+    return _supabase_client
+ 
+# --- Storage Backend ---
+# TODO_BACKEND=sqlite keeps todos in a local SQLite file (TODO_SQLITE_PATH)
+# instead of Supabase, e.g. for load tests or a single-node deployment.
+TODO_BACKEND = os.getenv("TODO_BACKEND", "supabase").lower()
+TODO_SQLITE_PATH = os.getenv("TODO_SQLITE_PATH", "todos.db")
+
+# Supabase calls go through a circuit breaker: once too many of the recent
+# calls failed or were slow, requests fail fast with 503 for
+# SUPABASE_BREAKER_OPEN_SECONDS instead of tying up workers, then a few trial
+# calls decide whether to close it again. Reads are retried with jitter.
+SUPABASE_BREAKER_FAILURE_RATE = float(os.getenv("SUPABASE_BREAKER_FAILURE_RATE", "0.5"))
+SUPABASE_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("SUPABASE_BREAKER_SLOW_CALL_SECONDS", "2"))
+SUPABASE_BREAKER_SLOW_CALL_RATE = float(os.getenv("SUPABASE_BREAKER_SLOW_CALL_RATE", "0.5"))
+SUPABASE_BREAKER_WINDOW = int(os.getenv("SUPABASE_BREAKER_WINDOW", "20"))
+SUPABASE_BREAKER_MIN_CALLS = int(os.getenv("SUPABASE_BREAKER_MIN_CALLS", "10"))
+SUPABASE_BREAKER_OPEN_SECONDS = float(os.getenv("SUPABASE_BREAKER_OPEN_SECONDS", "10"))
+SUPABASE_BREAKER_HALF_OPEN_CALLS = int(os.getenv("SUPABASE_BREAKER_HALF_OPEN_CALLS", "3"))
+SUPABASE_READ_RETRIES = int(os.getenv("SUPABASE_READ_RETRIES", "2"))
+SUPABASE_RETRY_BASE_DELAY = float(os.getenv("SUPABASE_RETRY_BASE_DELAY", "0.05"))
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _is_outage(exc):
+    """
+    Whether a failed call says something about Supabase's health. Requests
+    PostgREST rejects are the caller's fault and neither trip the breaker nor retry.
+    """
+    return not is_client_error(exc)
+
+
+supabase_breaker = None
+
+if TODO_BACKEND == "sqlite":
+    todo_repository = SQLiteTodoRepository(TODO_SQLITE_PATH)
+elif TODO_BACKEND == "supabase":
+    supabase_breaker = CircuitBreaker(
+        failure_rate=SUPABASE_BREAKER_FAILURE_RATE,
+        slow_call_seconds=SUPABASE_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate=SUPABASE_BREAKER_SLOW_CALL_RATE,
+        window_size=SUPABASE_BREAKER_WINDOW,
+        min_calls=SUPABASE_BREAKER_MIN_CALLS,
+        open_seconds=SUPABASE_BREAKER_OPEN_SECONDS,
+        half_open_calls=SUPABASE_BREAKER_HALF_OPEN_CALLS,
+        is_failure=_is_outage,
+    )
+    # Looked up on every call, so tests and benchmarks can replace get_supabase.
+    todo_repository = GuardedTodoRepository(
+        SupabaseTodoRepository(lambda: get_supabase()),
+        supabase_breaker,
+        read_retries=SUPABASE_READ_RETRIES,
+        retry_base_delay=SUPABASE_RETRY_BASE_DELAY,
+    )
+else:
+    raise RuntimeError(f"Unknown TODO_BACKEND {TODO_BACKEND!r}; expected 'supabase' or 'sqlite'")
+ 
+# --- Read Cache ---
+# Encoded GET responses, invalidated by this process's writes; the settings
+# are read by todo_responses.create_todo_cache.
+todo_cache = create_todo_cache()
+
+
+def _invalidate_todos(*todo_ids):
+    invalidate_todos(todo_cache, *todo_ids)
+
+
+def _cached_response(key, fetch):
+    """
+    Returns the cached body for key, or calls fetch() for the payload and
+    caches its encoding. fetch may return None for "not found", which isn't cached.
+    The body's ETag is cached with it, so a client whose If-None-Match still
+    matches gets a 304 without the payload being fetched or encoded again.
+    """
+    entry = todo_cache.get_with_etag(key)
+    if entry is None:
+        generation = todo_cache.generation
+        payload = fetch()
+        if payload is None:
+            return None
+        entry = cache_payload(app, todo_cache, key, generation, payload)
+    return conditional_response(app, request, *entry)
+ 
+# --- Local Replica ---
+# With TODO_REPLICA enabled, each process keeps the whole todos table in memory,
+# loaded by a paged scan and kept current by a Supabase realtime subscription,
+# and answers reads from it. If the feed hasn't been confirmed live for
+# TODO_REPLICA_MAX_STALENESS seconds, reads go to Supabase again, as do pages
+# not ordered by id and reads of todos this process wrote until their change
+# events arrive.
+TODO_REPLICA = os.getenv("TODO_REPLICA", "false").lower() in ("1", "true", "yes") and TODO_BACKEND == "supabase"
+TODO_REPLICA_MAX_STALENESS = float(os.getenv("TODO_REPLICA_MAX_STALENESS", "5"))
+
+
+def _replica_changed(*todo_ids):
+    if todo_ids:
+        _invalidate_todos(*todo_ids)
+    else:
+        # A reload may have changed any todo.
+        todo_cache.clear()
+
+
+todo_replica = TodoReplica(TODO_REPLICA_MAX_STALENESS, on_change=_replica_changed)
+_replica_thread = None
+_replica_lock = threading.Lock()
+
+
+def _forget_todo_replica():
+    global todo_replica, _replica_thread, _replica_lock
+    todo_replica = TodoReplica(TODO_REPLICA_MAX_STALENESS, on_change=_replica_changed)
+    _replica_thread = None
+    _replica_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_todo_replica)
+
+
+def _live_replica():
+    """
+    Returns the replica if it is enabled, starting its feed on first use in
+    each process. Reads from it raise ReplicaUnavailable until it is live.
+    """
+    global _replica_thread
+    if not TODO_REPLICA:
+        return None
+    if _replica_thread is None:
+        with _replica_lock:
+            if _replica_thread is None:
+                _replica_thread = start_realtime_feed(todo_replica, SUPABASE_URL, SUPABASE_KEY)
+    return todo_replica
+
+
+def _replicate(rows):
+    """
+    Invalidates the replica's copies of rows this process wrote until their
+    change events arrive; the feed, not the write's response, updates them.
+    """
+    if TODO_REPLICA:
+        todo_replica.invalidate([row["id"] for row in rows])
+ 
+# --- Write-Behind Inserts ---
+# With TODO_WRITE_BEHIND enabled, create_todo acknowledges a todo once it is
+# queued and spilled to local disk; a background thread inserts queued todos
+# in batches every TODO_WRITE_BEHIND_INTERVAL_MS or TODO_WRITE_BEHIND_BATCH_SIZE
+# todos. Spill files left by a crashed worker are replayed by the next one.
+# Todos the store rejects are moved to dead-letter.jsonl in the spill directory,
+# and creates are refused with 503 while TODO_WRITE_BEHIND_MAX_PENDING wait.
+TODO_WRITE_BEHIND = os.getenv("TODO_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+TODO_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("TODO_WRITE_BEHIND_BATCH_SIZE", "100"))
+TODO_WRITE_BEHIND_INTERVAL_MS = float(os.getenv("TODO_WRITE_BEHIND_INTERVAL_MS", "50"))
+TODO_WRITE_BEHIND_SPILL_DIR = os.getenv("TODO_WRITE_BEHIND_SPILL_DIR", "todo_spill")
+TODO_WRITE_BEHIND_MAX_PENDING = int(os.getenv("TODO_WRITE_BEHIND_MAX_PENDING", "10000"))
+
+
+def _insert_todos(records):
+    _replicate(todo_repository.insert(records))
+
+
+todo_write_buffer = WriteBehindBuffer(
+    _insert_todos,
+    TODO_WRITE_BEHIND_SPILL_DIR,
+    batch_size=min(TODO_WRITE_BEHIND_BATCH_SIZE, BULK_INSERT_CHUNK_SIZE),
+    interval=TODO_WRITE_BEHIND_INTERVAL_MS / 1000,
+    on_flush=_invalidate_todos,
+    max_pending=TODO_WRITE_BEHIND_MAX_PENDING,
+    is_outage=_is_outage,
+)
+
+if TODO_WRITE_BEHIND:
+    # Best effort; anything left over stays in the spill file for the next start.
+    atexit.register(todo_write_buffer.flush)
+ 
+@app.errorhandler(CircuitOpen)
+def circuit_open(e):
+    response = jsonify({"error": "Database temporarily unavailable, please retry later"})
+    response.headers["Retry-After"] = str(math.ceil(e.retry_after))
+    return response, 503
  
 # --- Core Services ---
  
@@ -28,74 +268,244 @@ def create_todo():
     """
     Creates a new todo in the Supabase 'todos' table.
     Expects JSON body with 'task' (string) and optional 'priority'.
+    With TODO_WRITE_BEHIND enabled, answers 202 once the todo is queued.
     """
     data = request.get_json()
-    if not data or 'task' not in data:
-        return jsonify({"error": "Missing 'task' in JSON body"}), 400
- 
     try:
-        new_task = str(data['task']).strip()
-        if not new_task:
-            return jsonify({"error": "Task cannot be empty"}), 400
+        new_record = build_todo_record(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
  
-        # Prepare the record for Supabase
-        new_record = {
-            "task": new_task,
-            "is_complete": False,
-            "priority": data.get("priority", "Medium")
-        }
-        
-        # Insert into Supabase
-        response = supabase.table("todos").insert(new_record).execute()
+    if TODO_WRITE_BEHIND:
+        try:
+            provisional_id = todo_write_buffer.add(new_record)
+        except QueueFull:
+            response = jsonify({"error": "Too many todos waiting to be stored, please retry later"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        except OSError as e:
+            return jsonify({"error": f"Failed to queue todo: {str(e)}"}), 503
+        # The todo has no database id yet; it shows up in reads once flushed.
+        return jsonify({
+            "message": "Todo accepted",
+            "provisional_id": provisional_id,
+            "data": new_record
+        }), 202
+ 
+    try:
+        created = todo_repository.insert([new_record])
+        _replicate(created)
+        _invalidate_todos()
         
-        if hasattr(response, 'data') and response.data:
+        if created:
             return jsonify({
                 "message": "Todo created successfully",
-                "data": response.data[0]
+                "data": created[0]
             }), 201
         else:
             return jsonify({"error": "Failed to create todo"}), 500
  
+    except CircuitOpen:
+        raise
+    except Exception as e:
+        return store_error("Server error", e)
+ 
+ 
+@app.route("/api/todos/bulk", methods=["POST"])
+def create_todos_bulk():
+    """
+    Creates many todos with one Supabase insert per chunk of 500 records.
+    Expects a JSON array of todos (or {"todos": [...]}), each validated like
+    create_todo. Nothing is inserted if any item is invalid.
+    """
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get("todos")
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Expected a non-empty JSON array of todos"}), 400
+    if len(data) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} todos can be created at once"}), 413
+ 
+    records, errors = [], []
+    for index, item in enumerate(data):
+        try:
+            records.append(build_todo_record(item))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        return jsonify({"error": "Invalid todos in request", "details": errors}), 400
+ 
+    created = []
+    try:
+        for start in range(0, len(records), BULK_INSERT_CHUNK_SIZE):
+            rows = todo_repository.insert(records[start:start + BULK_INSERT_CHUNK_SIZE])
+            _replicate(rows)
+            created.extend(rows)
+ 
+        return jsonify({
+            "message": "Todos created successfully",
+            "count": len(created),
+            "data": created
+        }), 201
+ 
     except Exception as e:
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+        if isinstance(e, CircuitOpen) and not created:
+            raise
+        # Earlier chunks may already be stored; tell the client which ones.
+        return jsonify({
+            "error": f"Server error: {str(e)}",
+            "created_ids": [row["id"] for row in created]
+        }), 500
+    finally:
+        if created:
+            _invalidate_todos()
  
  
+def _fetch_todos_page(limit, after=None, options=DEFAULT_TODO_QUERY):
+    """
+    Fetches up to 'limit' todos following the decoded cursor 'after'.
+    Returns the rows and the cursor for the next page (None on the last page).
+    Served from the local replica when it is enabled and live.
+    """
+    replica = _live_replica()
+    if replica is not None:
+        try:
+            return replica.page(limit, after, options)
+        except ReplicaUnavailable:
+            pass
+    return todo_repository.page(limit, after, options)
+
+
+def _stream_todos(stream_format, options):
+    """
+    Streams every matching todo as NDJSON or as a chunked JSON array, paging
+    through Supabase as the client reads so the full table is never held in
+    memory.
+    """
+    # The first page is fetched up front so that a failing Supabase call can
+    # still be reported with a proper error status.
+    rows, cursor = _fetch_todos_page(TODOS_MAX_PAGE_SIZE, options=options)
+
+    def generate_rows(rows, cursor):
+        while True:
+            yield from rows
+            if cursor is None:
+                return
+            rows, cursor = _fetch_todos_page(TODOS_MAX_PAGE_SIZE, cursor, options)
+
+    if stream_format == "ndjson":
+        def generate():
+            for row in generate_rows(rows, cursor):
+                yield app.json.dumps(row) + "\n"
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    def generate():
+        separator = "["
+        for row in generate_rows(rows, cursor):
+            yield separator + app.json.dumps(row)
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    return Response(generate(), mimetype="application/json")
+
+
 @app.route("/api/todos", methods=["GET"])
 def get_todos():
     """
-    Fetches all todos from the Supabase 'todos' table.
+    Fetches a page of todos from the Supabase 'todos' table, ordered by id.
+    Accepts 'limit' (default 100, max 1000) and 'after' (the 'next_cursor'
+    returned with the previous page) query parameters, plus 'fields',
+    'is_complete', 'priority' and 'order' (e.g. 'priority.desc').
+    With 'stream=ndjson' or 'stream=json', streams every todo instead.
+    Pages carry an ETag; a matching If-None-Match is answered with 304.
     """
     try:
-        response = supabase.table("todos").select("*").execute()
-        
-        return jsonify({
-            "data": response.data,
-            "count": len(response.data),
+        options = parse_todo_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream_format = request.args.get("stream")
+    if stream_format is not None:
+        if stream_format not in ("ndjson", "json"):
+            return jsonify({"error": "'stream' must be 'ndjson' or 'json'"}), 400
+        try:
+            return _stream_todos(stream_format, options)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            return store_error("Failed to fetch todos", e)
+
+    try:
+        limit = int(request.args.get("limit", TODOS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    if not 1 <= limit <= TODOS_MAX_PAGE_SIZE:
+        return jsonify({"error": f"'limit' must be between 1 and {TODOS_MAX_PAGE_SIZE}"}), 400
+    try:
+        after = request.args.get("after")
+        after = decode_cursor(after, options) if after is not None else None
+    except ValueError:
+        return jsonify({"error": "'after' must be a 'next_cursor' returned by this endpoint"}), 400
+
+    def fetch():
+        rows, next_cursor = _fetch_todos_page(limit, after, options)
+        return {
+            "data": rows,
+            "count": len(rows),
+            "next_cursor": encode_cursor(next_cursor),
             "status": "success"
-        })
+        }
+
+    try:
+        key = ("todos", limit, request.args.get("after"), *query_key(options))
+        return _cached_response(key, fetch)
  
+    except CircuitOpen:
+        raise
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch todos: {str(e)}"}), 500
+        return store_error("Failed to fetch todos", e)
  
  
 @app.route("/api/todos/<int:todo_id>", methods=["GET"])
 def get_todo(todo_id):
     """
     Fetches a specific todo by ID from Supabase.
+    Accepts the same 'fields', 'is_complete' and 'priority' parameters as
+    the list endpoint; a todo that doesn't match the filters is not found.
     """
     try:
-        response = supabase.table("todos").select("*").eq("id", todo_id).execute()
+        options = parse_todo_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def fetch():
+        replica = _live_replica()
+        try:
+            if replica is None:
+                raise ReplicaUnavailable("replica is disabled")
+            row = replica.get(todo_id, options)
+        except ReplicaUnavailable:
+            row = todo_repository.get(todo_id, options)
+        if row is None:
+            return None
+        return {
+            "data": row,
+            "status": "success"
+        }
+
+    try:
+        response = _cached_response(("todo", todo_id, *query_key(options)), fetch)
         
-        if not response.data:
+        if response is None:
             return jsonify({"error": "Todo not found"}), 404
             
-        return jsonify({
-            "data": response.data[0],
-            "status": "success"
-        })
+        return response
  
+    except CircuitOpen:
+        raise
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch todo: {str(e)}"}), 500
+        return store_error("Failed to fetch todo", e)
  
  
 @app.route("/api/todos/<int:todo_id>", methods=["PUT"])
@@ -115,18 +525,22 @@ def update_todo(todo_id):
         if not update_data:
             return jsonify({"error": "No valid fields to update"}), 400
  
-        response = supabase.table("todos").update(update_data).eq("id", todo_id).execute()
+        row = todo_repository.update(todo_id, update_data)
+        _invalidate_todos(todo_id)
         
-        if not response.data:
+        if row is None:
             return jsonify({"error": "Todo not found"}), 404
             
+        _replicate([row])
         return jsonify({
             "message": "Todo updated successfully",
-            "data": response.data[0]
+            "data": row
         })
  
+    except CircuitOpen:
+        raise
     except Exception as e:
-        return jsonify({"error": f"Failed to update todo: {str(e)}"}), 500
+        return store_error("Failed to update todo", e)
 
 @app.route("/api/todos/<int:todo_id>", methods=["DELETE"])
 def delete_todo(todo_id):
@@ -134,45 +548,191 @@ def delete_todo(todo_id):
     Deletes a specific todo from Supabase.
     """
     try:
-        # First check if todo exists
-        check_response = supabase.table("todos").select("id").eq("id", todo_id).execute()
+        # Delete returns the removed rows, so an empty result means the todo
+        # didn't exist; no separate existence check is needed.
+        deleted = todo_repository.delete(todo_id)
         
-        if not check_response.data:
+        if deleted is None:
             return jsonify({"error": "Todo not found"}), 404
  
-        # Delete the todo
-        delete_response = supabase.table("todos").delete().eq("id", todo_id).execute()
+        _replicate([deleted])
+        _invalidate_todos(todo_id)
         
         return jsonify({
             "message": "Todo deleted successfully",
             "deleted_id": todo_id
         }), 200
  
+    except CircuitOpen:
+        raise
     except Exception as e:
-        return jsonify({"error": f"Failed to delete todo: {str(e)}"}), 500
+        return store_error("Failed to delete todo", e)
  
-# --- Utility Services ---
+@app.route("/api/todos", methods=["PATCH"])
+def update_todos_bulk():
+    """
+    Applies the same update to many todos with a single Supabase call.
+    Todos are selected by query string, e.g. '?ids=1,2,3' or
+    '?is_complete=false'; the JSON body holds the fields to update.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "No data provided for update"}), 400
+ 
+    update_data = {k: v for k, v in data.items() if k != 'id'}
+    if not update_data:
+        return jsonify({"error": "No valid fields to update"}), 400
  
-@app.route("/api/health", methods=["GET"])
-def health_check():
-    """Health check endpoint to verify API and database connectivity."""
     try:
-        # Test database connection
-        test_response = supabase.table("todos").select("id").limit(1).execute()
+        selection = parse_bulk_selection(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+ 
+    try:
+        rows = todo_repository.update_where(update_data, selection)
+        updated_ids = [row["id"] for row in rows]
+        _replicate(rows)
+        _invalidate_todos(*updated_ids)
         
         return jsonify({
-            "status": "healthy",
-            "service": "supabase-todo-api",
-            "database": "connected"
-        }), 200
-        
+            "message": "Todos updated successfully",
+            "count": len(updated_ids),
+            "updated_ids": updated_ids
+        })
+ 
+    except CircuitOpen:
+        raise
     except Exception as e:
+        return store_error("Failed to update todos", e)
+ 
+ 
+@app.route("/api/todos", methods=["DELETE"])
+def delete_todos_bulk():
+    """
+    Deletes many todos with a single Supabase call.
+    Todos are selected by query string, e.g. '?ids=1,2,3' or '?is_complete=true'.
+    """
+    try:
+        selection = parse_bulk_selection(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+ 
+    try:
+        rows = todo_repository.delete_where(selection)
+        deleted_ids = [row["id"] for row in rows]
+        _replicate(rows)
+        _invalidate_todos(*deleted_ids)
+        
         return jsonify({
-            "status": "unhealthy",
-            "service": "supabase-todo-api",
-            "database": "disconnected",
-            "error": str(e)
-        }), 503
+            "message": "Todos deleted successfully",
+            "count": len(deleted_ids),
+            "deleted_ids": deleted_ids
+        })
+ 
+    except CircuitOpen:
+        raise
+    except Exception as e:
+        return store_error("Failed to delete todos", e)
+ 
+# --- Utility Services ---
+ 
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Reports hit/miss counters and size of the todo read cache."""
+    return jsonify(todo_cache.stats())
+ 
+ 
+@app.route("/api/todos/write-behind/stats", methods=["GET"])
+def write_behind_stats():
+    """Reports the queue depth and flush counters of the write-behind buffer."""
+    return jsonify({"enabled": TODO_WRITE_BEHIND, **todo_write_buffer.stats()})
+ 
+ 
+@app.route("/api/todos/replica/stats", methods=["GET"])
+def replica_stats():
+    """Reports size and freshness of the local todos replica."""
+    return jsonify({"enabled": TODO_REPLICA, **todo_replica.stats()})
+ 
+
+# Database health is probed in the background and served from memory, so
+# load balancer and Kubernetes probes don't each cost a Supabase query.
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+
+_health_result = None
+_health_thread = None
+_health_lock = threading.Lock()
+
+
+def _forget_health_probe():
+    global _health_result, _health_thread, _health_lock
+    _health_result = None
+    _health_thread = None
+    _health_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_health_probe)
+
+
+def _probe_database():
+    """Runs one live check against the todo store and caches the outcome."""
+    global _health_result
+    started = time.perf_counter()
+    try:
+        todo_repository.ping()
+        result = {"database": "connected"}
+    except Exception as e:
+        result = {"database": "disconnected", "error": str(e)}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    result["checked_at"] = time.time()
+    _health_result = result
+    return result
+
+
+def _refresh_health():
+    while True:
+        _probe_database()
+        time.sleep(HEALTH_PROBE_INTERVAL)
+
+
+def _cached_health():
+    """
+    Returns the latest background probe, starting the refresher thread on
+    first use in each process. Falls back to a live probe when there is no
+    result yet or the refresher has fallen well behind.
+    """
+    global _health_thread
+    if _health_thread is None:
+        with _health_lock:
+            if _health_thread is None:
+                _health_thread = threading.Thread(target=_refresh_health, name="health-probe", daemon=True)
+                _health_thread.start()
+    result = _health_result
+    if result is None or time.time() - result["checked_at"] > 3 * HEALTH_PROBE_INTERVAL:
+        return _probe_database(), False
+    return result, True
+
+
+@app.route("/api/health", methods=["GET"])
+def health_check():
+    """
+    Health check endpoint to verify API and database connectivity.
+    Answers from the last background probe; '?deep=1' forces a live check.
+    """
+    if request.args.get("deep") in ("1", "true"):
+        result, cached = _probe_database(), False
+    else:
+        result, cached = _cached_health()
+
+    healthy = result["database"] == "connected"
+    body = {
+        "status": "healthy" if healthy else "unhealthy",
+        "service": "supabase-todo-api",
+        **result,
+        "cached": cached,
+    }
+    if supabase_breaker is not None:
+        body["circuit"] = supabase_breaker.stats()
+    return jsonify(body), 200 if healthy else 503
  
  
 if __name__ == "__main__":
@@ -0,0 +1,425 @@
+from quart import Quart, Response, jsonify, request
+from supabase import acreate_client, AsyncClient
+import os
+from dotenv import load_dotenv
+from json_provider import FastJSONProvider
+from todo_responses import cache_payload, conditional_response, create_todo_cache, invalidate_todos, store_error
+from todo_queries import (
+    BULK_INSERT_CHUNK_SIZE,
+    BULK_MAX_ITEMS,
+    DEFAULT_TODO_QUERY,
+    TODOS_MAX_PAGE_SIZE,
+    TODOS_PAGE_SIZE,
+    build_todo_record,
+    bulk_target,
+    decode_cursor,
+    encode_cursor,
+    page_query,
+    parse_bulk_selection,
+    parse_todo_query,
+    query_key,
+    split_page,
+    todos_query,
+)
+
+load_dotenv()
+
+# --- Async variant of the Supabase todo API (app1.py) ---
+# Same endpoints and responses, served by Quart on an ASGI server with the
+# async Supabase client, so one process keeps many Supabase calls in flight:
+#
+#   hypercorn app1_async:app --bind 0.0.0.0:8000
+
+# --- Supabase Configuration ---
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+app = Quart(__name__)
+app.json = FastJSONProvider(app)
+
+# The async client is created on the serving event loop, at startup.
+supabase: AsyncClient = None
+
+
+@app.before_serving
+async def create_supabase_client():
+    global supabase
+    supabase = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+
+# --- Read Cache ---
+# See app1.py: encoded GET responses, invalidated by this process's writes.
+todo_cache = create_todo_cache()
+
+
+def _invalidate_todos(*todo_ids):
+    invalidate_todos(todo_cache, *todo_ids)
+
+
+async def _cached_response(key, fetch):
+    """
+    Returns the cached body for key, or awaits fetch() for the payload and
+    caches its encoding. fetch may return None for "not found", which isn't cached.
+    The body's ETag is cached with it, so a client whose If-None-Match still
+    matches gets a 304 without the payload being fetched or encoded again.
+    """
+    entry = todo_cache.get_with_etag(key)
+    if entry is None:
+        generation = todo_cache.generation
+        payload = await fetch()
+        if payload is None:
+            return None
+        entry = cache_payload(app, todo_cache, key, generation, payload)
+    return conditional_response(app, request, *entry)
+ 
+# --- Core Services ---
+
+@app.route("/")
+async def hello():
+    """A simple welcome message."""
+    return "Hello! This API interacts with a real Supabase 'todos' table."
+
+# --- Todo Management Endpoints ---
+
+@app.route("/api/todos", methods=["POST"])
+async def create_todo():
+    """
+    Creates a new todo in the Supabase 'todos' table.
+    Expects JSON body with 'task' (string) and optional 'priority'.
+    """
+    data = await request.get_json()
+    try:
+        new_record = build_todo_record(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = await supabase.table("todos").insert(new_record).execute()
+        _invalidate_todos()
+
+        if hasattr(response, 'data') and response.data:
+            return jsonify({
+                "message": "Todo created successfully",
+                "data": response.data[0]
+            }), 201
+        else:
+            return jsonify({"error": "Failed to create todo"}), 500
+
+    except Exception as e:
+        return store_error("Server error", e)
+
+
+@app.route("/api/todos/bulk", methods=["POST"])
+async def create_todos_bulk():
+    """
+    Creates many todos with one Supabase insert per chunk of 500 records.
+    Expects a JSON array of todos (or {"todos": [...]}), each validated like
+    create_todo. Nothing is inserted if any item is invalid.
+    """
+    data = await request.get_json()
+    if isinstance(data, dict):
+        data = data.get("todos")
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Expected a non-empty JSON array of todos"}), 400
+    if len(data) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} todos can be created at once"}), 413
+
+    records, errors = [], []
+    for index, item in enumerate(data):
+        try:
+            records.append(build_todo_record(item))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        return jsonify({"error": "Invalid todos in request", "details": errors}), 400
+
+    created = []
+    try:
+        for start in range(0, len(records), BULK_INSERT_CHUNK_SIZE):
+            response = await supabase.table("todos").insert(records[start:start + BULK_INSERT_CHUNK_SIZE]).execute()
+            created.extend(response.data)
+
+        return jsonify({
+            "message": "Todos created successfully",
+            "count": len(created),
+            "data": created
+        }), 201
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Server error: {str(e)}",
+            "created_ids": [row["id"] for row in created]
+        }), 500
+    finally:
+        if created:
+            _invalidate_todos()
+
+
+async def _fetch_todos_page(limit, after=None, options=DEFAULT_TODO_QUERY):
+    """
+    Fetches up to 'limit' todos following the decoded cursor 'after'.
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    query = page_query(supabase.table("todos"), limit, after, options)
+    return split_page((await query.execute()).data, limit, options)
+
+
+async def _stream_todos(stream_format, options):
+    """
+    Streams every matching todo as NDJSON or as a chunked JSON array, paging
+    through Supabase as the client reads.
+    """
+    # The first page is fetched up front so that a failing Supabase call can
+    # still be reported with a proper error status.
+    rows, cursor = await _fetch_todos_page(TODOS_MAX_PAGE_SIZE, options=options)
+
+    async def generate_rows(rows, cursor):
+        while True:
+            for row in rows:
+                yield row
+            if cursor is None:
+                return
+            rows, cursor = await _fetch_todos_page(TODOS_MAX_PAGE_SIZE, cursor, options)
+
+    if stream_format == "ndjson":
+        async def generate():
+            async for row in generate_rows(rows, cursor):
+                yield (app.json.dumps(row) + "\n").encode()
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    async def generate():
+        separator = "["
+        async for row in generate_rows(rows, cursor):
+            yield (separator + app.json.dumps(row)).encode()
+            separator = ","
+        yield b"[]" if separator == "[" else b"]"
+
+    return Response(generate(), mimetype="application/json")
+
+
+@app.route("/api/todos", methods=["GET"])
+async def get_todos():
+    """
+    Fetches a page of todos from the Supabase 'todos' table, ordered by id.
+    Accepts the same query parameters as app1.get_todos.
+    """
+    try:
+        options = parse_todo_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream_format = request.args.get("stream")
+    if stream_format is not None:
+        if stream_format not in ("ndjson", "json"):
+            return jsonify({"error": "'stream' must be 'ndjson' or 'json'"}), 400
+        try:
+            return await _stream_todos(stream_format, options)
+        except Exception as e:
+            return store_error("Failed to fetch todos", e)
+
+    try:
+        limit = int(request.args.get("limit", TODOS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    if not 1 <= limit <= TODOS_MAX_PAGE_SIZE:
+        return jsonify({"error": f"'limit' must be between 1 and {TODOS_MAX_PAGE_SIZE}"}), 400
+    try:
+        after = request.args.get("after")
+        after = decode_cursor(after, options) if after is not None else None
+    except ValueError:
+        return jsonify({"error": "'after' must be a 'next_cursor' returned by this endpoint"}), 400
+
+    async def fetch():
+        rows, next_cursor = await _fetch_todos_page(limit, after, options)
+        return {
+            "data": rows,
+            "count": len(rows),
+            "next_cursor": encode_cursor(next_cursor),
+            "status": "success"
+        }
+
+    try:
+        key = ("todos", limit, request.args.get("after"), *query_key(options))
+        return await _cached_response(key, fetch)
+
+    except Exception as e:
+        return store_error("Failed to fetch todos", e)
+
+
+@app.route("/api/todos/<int:todo_id>", methods=["GET"])
+async def get_todo(todo_id):
+    """
+    Fetches a specific todo by ID from Supabase.
+    Accepts the same 'fields', 'is_complete' and 'priority' parameters as
+    the list endpoint.
+    """
+    try:
+        options = parse_todo_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    async def fetch():
+        response = await todos_query(supabase.table("todos"), options).eq("id", todo_id).execute()
+        if not response.data:
+            return None
+        return {
+            "data": response.data[0],
+            "status": "success"
+        }
+
+    try:
+        response = await _cached_response(("todo", todo_id, *query_key(options)), fetch)
+
+        if response is None:
+            return jsonify({"error": "Todo not found"}), 404
+
+        return response
+
+    except Exception as e:
+        return store_error("Failed to fetch todo", e)
+
+
+@app.route("/api/todos/<int:todo_id>", methods=["PUT"])
+async def update_todo(todo_id):
+    """
+    Updates a specific todo in Supabase.
+    Expects JSON body with fields to update.
+    """
+    data = await request.get_json()
+    if not data:
+        return jsonify({"error": "No data provided for update"}), 400
+
+    try:
+        update_data = {k: v for k, v in data.items() if k != 'id'}
+
+        if not update_data:
+            return jsonify({"error": "No valid fields to update"}), 400
+
+        response = await supabase.table("todos").update(update_data).eq("id", todo_id).execute()
+        _invalidate_todos(todo_id)
+
+        if not response.data:
+            return jsonify({"error": "Todo not found"}), 404
+
+        return jsonify({
+            "message": "Todo updated successfully",
+            "data": response.data[0]
+        })
+
+    except Exception as e:
+        return store_error("Failed to update todo", e)
+
+@app.route("/api/todos/<int:todo_id>", methods=["DELETE"])
+async def delete_todo(todo_id):
+    """
+    Deletes a specific todo from Supabase in one round trip.
+    """
+    try:
+        delete_response = await supabase.table("todos").delete().eq("id", todo_id).execute()
+
+        if not delete_response.data:
+            return jsonify({"error": "Todo not found"}), 404
+
+        _invalidate_todos(todo_id)
+
+        return jsonify({
+            "message": "Todo deleted successfully",
+            "deleted_id": todo_id
+        }), 200
+
+    except Exception as e:
+        return store_error("Failed to delete todo", e)
+
+
+@app.route("/api/todos", methods=["PATCH"])
+async def update_todos_bulk():
+    """
+    Applies the same update to many todos with a single Supabase call.
+    Todos are selected by query string, e.g. '?ids=1,2,3' or
+    '?is_complete=false'; the JSON body holds the fields to update.
+    """
+    data = await request.get_json()
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "No data provided for update"}), 400
+
+    update_data = {k: v for k, v in data.items() if k != 'id'}
+    if not update_data:
+        return jsonify({"error": "No valid fields to update"}), 400
+
+    try:
+        query = bulk_target(supabase.table("todos").update(update_data), parse_bulk_selection(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = await query.execute()
+        updated_ids = [row["id"] for row in response.data]
+        _invalidate_todos(*updated_ids)
+
+        return jsonify({
+            "message": "Todos updated successfully",
+            "count": len(updated_ids),
+            "updated_ids": updated_ids
+        })
+
+    except Exception as e:
+        return store_error("Failed to update todos", e)
+
+
+@app.route("/api/todos", methods=["DELETE"])
+async def delete_todos_bulk():
+    """
+    Deletes many todos with a single Supabase call.
+    Todos are selected by query string, e.g. '?ids=1,2,3' or '?is_complete=true'.
+    """
+    try:
+        query = bulk_target(supabase.table("todos").delete(), parse_bulk_selection(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = await query.execute()
+        deleted_ids = [row["id"] for row in response.data]
+        _invalidate_todos(*deleted_ids)
+
+        return jsonify({
+            "message": "Todos deleted successfully",
+            "count": len(deleted_ids),
+            "deleted_ids": deleted_ids
+        })
+
+    except Exception as e:
+        return store_error("Failed to delete todos", e)
+
+# --- Utility Services ---
+
+@app.route("/api/cache/stats", methods=["GET"])
+async def cache_stats():
+    """Reports hit/miss counters and size of the todo read cache."""
+    return jsonify(todo_cache.stats())
+
+
+@app.route("/api/health", methods=["GET"])
+async def health_check():
+    """Health check endpoint to verify API and database connectivity."""
+    try:
+        await supabase.table("todos").select("id").limit(1).execute()
+
+        return jsonify({
+            "status": "healthy",
+            "service": "supabase-todo-api",
+            "database": "connected"
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "unhealthy",
+            "service": "supabase-todo-api",
+            "database": "disconnected",
+            "error": str(e)
+        }), 503
+
+
+if __name__ == "__main__":
+    # Development server only; use an ASGI server such as hypercorn in production.
+    app.run(debug=False, use_reloader=False)
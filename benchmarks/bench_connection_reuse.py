@@ -0,0 +1,77 @@
+"""Checks that app1's Supabase client reuses HTTP connections under load.
+
+Starts a local HTTP/1.1 server that answers like PostgREST and counts the TCP
+connections it accepts, then drives GET /api/todos/<id> from several threads.
+With pooling working, connections stay close to the thread count no matter
+how many requests are made. Run from the repository root:
+
+    python benchmarks/bench_connection_reuse.py [requests] [threads]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps([{"id": 1, "task": "stand-in", "is_complete": False, "priority": "Medium"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+    _lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+def main(requests, threads):
+    server = CountingServer(("127.0.0.1", 0), PostgrestStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("SUPABASE_KEY", "stand-in")
+    os.environ["TODO_CACHE_TTL"] = "0"
+
+    import app1
+    # Bypass the read cache so every request reaches the stand-in.
+    app1.todo_cache.max_entries = 0
+    client = app1.app.test_client()
+
+    def call(i):
+        assert client.get(f"/api/todos/{i}").status_code == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{requests} requests from {threads} threads in {elapsed:.2f}s")
+    print(f"TCP connections opened: {server.connections} "
+          f"(pool limit {app1.SUPABASE_MAX_CONNECTIONS})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
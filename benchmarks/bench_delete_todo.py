@@ -0,0 +1,66 @@
+"""Compares delete_todo against the previous check-then-delete implementation.
+
+Both run against an in-memory Supabase stand-in that adds a fixed latency per
+round trip. Run from the repository root:
+
+    python benchmarks/bench_delete_todo.py [deletes] [latency_ms]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# app1 reads its settings from the environment; the stand-in replaces the client below.
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "stand-in")
+
+from flask import jsonify
+
+import app1
+from supabase_stand_in import SupabaseStandIn
+
+
+def legacy_delete_todo(todo_id):
+    """The previous implementation: an existence check, then the delete."""
+    check_response = app1.get_supabase().table("todos").select("id").eq("id", todo_id).execute()
+    if not check_response.data:
+        return jsonify({"error": "Todo not found"}), 404
+    app1.get_supabase().table("todos").delete().eq("id", todo_id).execute()
+    return jsonify({"message": "Todo deleted successfully", "deleted_id": todo_id}), 200
+
+
+def run(delete, deletes):
+    stand_in = app1.get_supabase()
+    ids = [row["id"] for row in stand_in.table("todos").insert(
+        [{"task": f"task {i}", "is_complete": False, "priority": "Medium"} for i in range(deletes)]
+    ).execute().data]
+    stand_in.round_trips = 0
+    with app1.app.test_request_context():
+        start = time.perf_counter()
+        for todo_id in ids:
+            delete(todo_id)
+        elapsed = time.perf_counter() - start
+    return elapsed / deletes, stand_in.round_trips / deletes
+
+
+def main(deletes, latency_ms):
+    stand_in = SupabaseStandIn(latency=latency_ms / 1000)
+    app1.get_supabase = lambda: stand_in
+    print(f"{deletes} deletes, {latency_ms} ms simulated Supabase latency")
+    print(f"{'implementation':>16} {'ms/delete':>10} {'round trips':>12}")
+    results = {}
+    for name, delete in (("check+delete", legacy_delete_todo), ("delete_todo", app1.delete_todo)):
+        per_delete, round_trips = run(delete, deletes)
+        results[name] = per_delete
+        print(f"{name:>16} {per_delete * 1000:>10.2f} {round_trips:>12.1f}")
+    print(f"{'speedup':>16} {results['check+delete'] / results['delete_todo']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0,
+    )
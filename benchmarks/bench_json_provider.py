@@ -0,0 +1,66 @@
+"""Compares Flask's default JSON provider with FastJSONProvider on todo listings.
+
+Run from the repository root:
+
+    python benchmarks/bench_json_provider.py [rows ...]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import FastJSONProvider, orjson
+
+
+def make_todos(count):
+    """Builds rows shaped like the Supabase 'todos' table."""
+    return [
+        {
+            "id": i,
+            "task": f"Task number {i} with a reasonably long description",
+            "is_complete": i % 3 == 0,
+            "priority": ("Low", "Medium", "High")[i % 3],
+            "created_at": "2024-01-01T12:00:00.000000+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def bench(provider_class, rows, repeat):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    payload = {"data": rows, "count": len(rows), "status": "success"}
+    body = jsonify_body(app, payload)
+    with app.app_context():
+        encode = min(timeit.repeat(lambda: jsonify(payload), number=1, repeat=repeat))
+    decode = min(timeit.repeat(lambda: app.json.loads(body), number=1, repeat=repeat))
+    return encode, decode, body
+
+
+def jsonify_body(app, payload):
+    with app.app_context():
+        return jsonify(payload).get_data()
+
+
+def main(sizes):
+    if orjson is None:
+        print("orjson is not installed; FastJSONProvider falls back to the stdlib.")
+    print(f"{'rows':>8} {'provider':>10} {'encode ms':>10} {'decode ms':>10}")
+    for count in sizes:
+        rows = make_todos(count)
+        results = {}
+        for name, provider_class in (("stdlib", DefaultJSONProvider), ("fast", FastJSONProvider)):
+            encode, decode, body = bench(provider_class, rows, repeat=5)
+            results[name] = (encode, decode, body)
+            print(f"{count:>8} {name:>10} {encode * 1000:>10.2f} {decode * 1000:>10.2f}")
+        stdlib, fast = results["stdlib"], results["fast"]
+        assert DefaultJSONProvider(Flask(__name__)).loads(fast[2]) == DefaultJSONProvider(Flask(__name__)).loads(stdlib[2])
+        print(f"{'':>8} {'speedup':>10} {stdlib[0] / fast[0]:>9.1f}x {stdlib[1] / fast[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1_000, 10_000, 100_000])
@@ -0,0 +1,76 @@
+"""Compares GET /api/todos/<id> served by Supabase with the local replica.
+
+The replica is loaded from an in-memory Supabase stand-in and follows its
+writes through the stand-in's change callbacks instead of realtime. The read
+cache is disabled so every request reaches the data source. Run from the
+repository root:
+
+    python benchmarks/bench_replica_reads.py [reads] [latency_ms]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# app1 reads its settings from the environment; the stand-in replaces the client below.
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "stand-in")
+os.environ["TODO_CACHE_MAX_ENTRIES"] = "0"
+
+import app1
+from supabase_stand_in import SupabaseStandIn
+
+
+def follow_stand_in(stand_in):
+    """Replaces start_realtime_feed: loads the replica from the stand-in and follows its writes."""
+    def start(replica, *args, **kwargs):
+        replica.begin_load()
+        stand_in.on_change(replica.apply_change)
+        replica.load([dict(row) for row in stand_in.tables.get("todos", {}).values()])
+        # The stand-in can't disconnect, so the feed is always live.
+        replica.max_staleness = float("inf")
+        return "stand-in"
+    return start
+
+
+def run(client, ids, reads):
+    start = time.perf_counter()
+    for i in range(reads):
+        response = client.get(f"/api/todos/{ids[i % len(ids)]}")
+        assert response.status_code == 200, response.get_json()
+    return (time.perf_counter() - start) / reads
+
+
+def main(reads, latency_ms):
+    stand_in = SupabaseStandIn(latency=latency_ms / 1000)
+    app1.get_supabase = lambda: stand_in
+    app1.start_realtime_feed = follow_stand_in(stand_in)
+    ids = [row["id"] for row in stand_in.table("todos").insert(
+        [{"task": f"task {i}", "is_complete": False, "priority": "Medium"} for i in range(1000)]
+    ).execute().data]
+    client = app1.app.test_client()
+
+    print(f"{reads} reads, {latency_ms} ms simulated Supabase latency")
+    results = {}
+    for name, enabled in (("supabase", False), ("replica", True)):
+        app1.TODO_REPLICA = enabled
+        stand_in.round_trips = 0
+        results[name] = run(client, ids, reads)
+        print(f"{name:>10} {results[name] * 1000:>8.3f} ms/read {stand_in.round_trips:>6} round trips")
+    print(f"{'speedup':>10} {results['supabase'] / results['replica']:>8.1f}x")
+
+    # A write through the API (or any other writer) is visible to the next read.
+    stand_in.table("todos").update({"task": "changed elsewhere"}).eq("id", ids[0]).execute()
+    assert client.get(f"/api/todos/{ids[0]}").get_json()["data"]["task"] == "changed elsewhere"
+    client.delete(f"/api/todos/{ids[1]}")
+    assert client.get(f"/api/todos/{ids[1]}").status_code == 404
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
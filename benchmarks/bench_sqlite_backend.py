@@ -0,0 +1,51 @@
+"""Measures app1 request throughput on the embedded SQLite backend.
+
+Needs no Supabase project: the database is a temporary file. Requests go
+through the Flask test client from several threads, with the read cache
+disabled so every request reaches SQLite. Run from the repository root:
+
+    python benchmarks/bench_sqlite_backend.py [requests] [threads]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATABASE_DIR = tempfile.mkdtemp()
+os.environ["TODO_BACKEND"] = "sqlite"
+os.environ["TODO_SQLITE_PATH"] = os.path.join(DATABASE_DIR, "todos.db")
+os.environ["TODO_CACHE_MAX_ENTRIES"] = "0"
+
+import app1
+
+
+def measure(name, requests, threads, send):
+    client = app1.app.test_client()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(lambda i: send(client, i), range(requests)))
+    elapsed = time.perf_counter() - start
+    errors = sum(status >= 400 for status in statuses)
+    print(f"{name:>12} {requests / elapsed:>10.0f} req/s {elapsed / requests * 1000:>8.3f} ms/req {errors:>6} errors")
+
+
+def main(requests, threads):
+    print(f"{requests} requests per endpoint, {threads} threads, database in {DATABASE_DIR}")
+    measure("create", requests, threads,
+            lambda client, i: client.post("/api/todos", json={"task": f"task {i}", "priority": "High" if i % 3 else "Low"}).status_code)
+    measure("get", requests, threads,
+            lambda client, i: client.get(f"/api/todos/{i % requests + 1}").status_code)
+    measure("list", requests, threads,
+            lambda client, i: client.get("/api/todos?limit=100&priority=High&order=id.desc").status_code)
+    measure("update", requests, threads,
+            lambda client, i: client.put(f"/api/todos/{i % requests + 1}", json={"is_complete": True}).status_code)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
@@ -0,0 +1,66 @@
+"""Measures per-request latency of the calculator routes with and without FastPathMiddleware.
+
+Calls the WSGI application directly, so the numbers are framework overhead
+only (no server or network). Run from the repository root:
+
+    python benchmarks/bench_wsgi_fast_path.py [requests]
+"""
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as calculator
+
+PATHS = [
+    ("/", ""),
+    ("/health", ""),
+    ("/add", "a=7&b=6"),
+    ("/divide", "a=100&b=4"),
+    ("/cube", "x=3"),
+]
+
+
+def make_environ(path, query):
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "5000",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+def call(wsgi_app, path, query):
+    body = wsgi_app(make_environ(path, query), lambda status, headers: None)
+    b"".join(body)
+    if hasattr(body, "close"):
+        body.close()
+
+
+def main(requests):
+    flask_app = calculator.app.wsgi_app
+    if isinstance(flask_app, calculator.FastPathMiddleware):
+        flask_app = flask_app.wsgi_app
+    fast_app = calculator.FastPathMiddleware(calculator.app, flask_app)
+    print(f"{'route':>10} {'flask us':>10} {'fast us':>10} {'speedup':>8}")
+    for path, query in PATHS:
+        timings = []
+        for wsgi_app in (flask_app, fast_app):
+            call(wsgi_app, path, query)  # warm the result cache
+            best = min(timeit.repeat(lambda: call(wsgi_app, path, query), number=requests, repeat=5))
+            timings.append(best / requests * 1e6)
+        print(f"{path:>10} {timings[0]:>10.1f} {timings[1]:>10.1f} {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
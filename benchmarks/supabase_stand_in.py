@@ -0,0 +1,98 @@
+"""Minimal in-memory stand-in for the Supabase client, with simulated latency.
+
+Supports the subset of the query builder used by app1.py that the benchmarks
+exercise: select/insert/update/delete with eq/in_ filters. Every execute()
+counts as one round trip and sleeps for the configured latency. Callbacks
+registered with on_change receive each write as a realtime postgres_changes
+payload, standing in for a realtime subscription.
+"""
+import itertools
+import threading
+import time
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.filters = []
+
+    def select(self, columns="*"):
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def execute(self):
+        self.client.round_trips += 1
+        time.sleep(self.client.latency)
+        rows = self.client.tables.setdefault(self.table, {})
+        with self.client.lock:
+            if self.action == "insert":
+                payload = self.payload if isinstance(self.payload, list) else [self.payload]
+                created = []
+                for record in payload:
+                    row = {"id": next(self.client.ids), **record}
+                    rows[row["id"]] = row
+                    created.append(dict(row))
+                self.client.emit(self.table, "INSERT", created)
+                return _Response(created)
+            matched = [row for row in rows.values() if all(f(row) for f in self.filters)]
+            if self.action == "update":
+                for row in matched:
+                    row.update(self.payload)
+                self.client.emit(self.table, "UPDATE", matched)
+            elif self.action == "delete":
+                for row in matched:
+                    del rows[row["id"]]
+                self.client.emit(self.table, "DELETE", matched)
+            return _Response([dict(row) for row in matched])
+
+
+class SupabaseStandIn:
+    def __init__(self, latency=0.005):
+        self.latency = latency
+        self.round_trips = 0
+        self.tables = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.change_callbacks = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def on_change(self, callback):
+        self.change_callbacks.append(callback)
+
+    def emit(self, table, event, rows):
+        for row in rows:
+            record = {"id": row["id"]} if event == "DELETE" else dict(row)
+            key = "old_record" if event == "DELETE" else "record"
+            payload = {"data": {"schema": "public", "table": table, "type": event, key: record}, "ids": []}
+            for callback in self.change_callbacks:
+                callback(payload)
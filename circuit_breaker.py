@@ -0,0 +1,134 @@
+"""Circuit breaker for calls to a remote dependency.
+
+The breaker watches the outcome and duration of the last ``window_size``
+calls. Once at least ``min_calls`` have been seen, it opens when the share
+of failed calls reaches ``failure_rate`` or the share of calls slower than
+``slow_call_seconds`` reaches ``slow_call_rate``. While open, calls fail
+fast with :class:`CircuitOpen`. After ``open_seconds`` it lets up to
+``half_open_calls`` trial calls through: if they all succeed quickly it
+closes, and any failure or slow call opens it again.
+"""
+import collections
+import os
+import random
+import threading
+import time
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Thread-safe breaker; wrap each dependency call in call()."""
+
+    def __init__(self, failure_rate=0.5, slow_call_seconds=2.0, slow_call_rate=0.5, window_size=20,
+                 min_calls=10, open_seconds=10.0, half_open_calls=3, is_failure=None):
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        # Which exceptions say something about the dependency's health;
+        # anything else (e.g. a rejected request) is passed through as a success.
+        self.is_failure = is_failure or (lambda exc: True)
+        self.times_opened = self.rejected = 0
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.state = CLOSED
+        self._outcomes = collections.deque(maxlen=self.window_size)  # (failed, slow)
+        self._opened_at = None
+        self._trials = self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpen(remaining)
+                self.state = HALF_OPEN
+                self._trials = self._trial_successes = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpen(self.open_seconds / 2)
+                self._trials += 1
+
+    def _record(self, failed, slow):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self.state = CLOSED
+                        self._outcomes.clear()
+                return
+            if self.state == OPEN:
+                return  # a call that started before the breaker opened
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls >= self.min_calls:
+                failures = sum(failed for failed, _ in self._outcomes)
+                slow_calls = sum(slow for _, slow in self._outcomes)
+                if failures >= self.failure_rate * calls or slow_calls >= self.slow_call_rate * calls:
+                    self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def call(self, fn, *args, **kwargs):
+        """Calls fn unless the breaker is open, and records how the call went."""
+        self._acquire()
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._record(self.is_failure(exc), time.monotonic() - started > self.slow_call_seconds)
+            raise
+        self._record(False, time.monotonic() - started > self.slow_call_seconds)
+        return result
+
+    def call_with_retries(self, fn, *args, retries=2, base_delay=0.05, max_delay=1.0, **kwargs):
+        """
+        call() with up to 'retries' retries after dependency failures, sleeping
+        a random ("full jitter") share of an exponentially growing delay
+        between attempts. Only use it for idempotent calls. Never retries when
+        the breaker is open.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return self.call(fn, *args, **kwargs)
+            except CircuitOpen:
+                raise
+            except Exception as exc:
+                if attempt == retries or not self.is_failure(exc):
+                    raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls_in_window": calls,
+                "failure_rate": round(sum(failed for failed, _ in self._outcomes) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(slow for _, slow in self._outcomes) / calls, 3) if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
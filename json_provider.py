@@ -0,0 +1,86 @@
+"""Fast JSON provider shared by the Flask apps.
+
+Uses orjson when it is installed and falls back to the stdlib ``json`` module
+otherwise, or whenever orjson cannot reproduce the stdlib semantics (for
+example integers outside the 64-bit range, which orjson rejects on encode and
+silently turns into floats on decode).
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Any run of 19+ digits may be an integer beyond 64 bits. Matches inside
+# strings or float fractions are harmless: they only cost a stdlib decode.
+# Mapping digits to b"0" and searching for the run is much cheaper than a regex.
+_DIGITS_ONLY = bytes(ord("0") if chr(i).isdigit() and i < 128 else ord(" ") for i in range(256))
+_LONG_DIGIT_RUN = b"0" * 19
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's default provider backed by orjson.
+
+    Output decodes to the same values as with the default provider; only
+    insignificant formatting differs (non-ASCII text is emitted as UTF-8
+    rather than escaped). The exception is non-finite floats: orjson writes
+    NaN and +/-Infinity as null where the stdlib writes the non-standard
+    NaN/Infinity tokens, so callers must not pass them (the calculator
+    endpoints reject such results before encoding).
+    """
+
+    use_orjson = orjson is not None
+
+    def _orjson_options(self, kwargs):
+        """Maps the json.dumps kwargs Flask uses onto orjson options, or None if unsupported."""
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.pop("sort_keys", self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        indent = kwargs.pop("indent", None)
+        if indent == 2:
+            options |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            return None
+        kwargs.pop("separators", None)
+        kwargs.pop("ensure_ascii", None)
+        kwargs.pop("default", None)
+        return None if kwargs else options
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Serializes obj to UTF-8 encoded JSON bytes."""
+        if self.use_orjson:
+            options = self._orjson_options(dict(kwargs))
+            if options is not None:
+                try:
+                    return orjson.dumps(obj, default=kwargs.get("default", self.default), option=options)
+                except TypeError:
+                    pass
+        return super().dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            data = s.encode() if isinstance(s, str) else s
+            if _LONG_DIGIT_RUN not in data.translate(_DIGITS_ONLY):
+                try:
+                    return orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    # The stdlib also accepts NaN/Infinity; let it decide.
+                    pass
+        return super().loads(s, **kwargs)
+
+    def response_bytes(self, obj):
+        """Encodes obj exactly as the body of :meth:`response`, without an app context."""
+        dump_args = {}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args["indent"] = 2
+        else:
+            dump_args["separators"] = (",", ":")
+        return self.dumps_bytes(obj, **dump_args) + b"\n"
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.response_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,98 @@
+"""In-process LRU cache of encoded response bodies, shared by the Flask apps."""
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+import time
+
+
+def content_etag(body):
+    """Derives a strong ETag from an encoded response body."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache of encoded response bodies, bounded by entries and bytes."""
+
+    def __init__(self, max_entries, max_bytes, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        # Bumped on every invalidation, so a reader that fetched data before a
+        # concurrent write can tell its result is stale and must not be stored.
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (body, size, expires_at, etag)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(key, body):
+        return len(body) + sum(sys.getsizeof(part) for part in key)
+
+    def get(self, key):
+        entry = self.get_with_etag(key)
+        return entry[0] if entry is not None else None
+
+    def get_with_etag(self, key):
+        """Returns (body, etag) for key, or None; etag is None unless one was stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[3]
+
+    def set(self, key, body, generation=None, etag=None):
+        """Stores body under key, unless an invalidation happened since generation was read."""
+        size = self._sizeof(key, body)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._discard(key)
+            self._entries[key] = (body, size, expires_at, etag)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
+
+    def discard_where(self, predicate):
+        """Drops every entry whose key satisfies predicate."""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,69 @@
+import pytest
+
+import app as calculator
+
+TOO_LARGE = "Result too large: it exceeds the digits the API can return"
+
+
+@pytest.fixture
+def client():
+    return calculator.app.test_client()
+
+
+def batch(client, **body):
+    response = client.post("/batch", json=body)
+    return response.status_code, response.get_json()
+
+
+@pytest.mark.parametrize("operation, a, b, expected", [
+    ("add", [1, 2, -3], [3, 4, 3], [4, 6, 0]),
+    ("subtract", [10, 0], [4, 5], [6, -5]),
+    ("multiply", [2, 2 ** 40], [3, 2 ** 40], [6, 2 ** 80]),
+    ("divide", [1, 7], [2, 2], [0.5, 3.5]),
+])
+def test_applies_the_operation_per_element(client, operation, a, b, expected):
+    status, body = batch(client, operation=operation, a=a, b=b)
+    assert status == 200
+    assert body == {"operation": operation, "errors": 0, "results": [{"result": result} for result in expected]}
+
+
+def test_cube(client):
+    status, body = batch(client, operation="cube", x=[2, -3, 10 ** 30])
+    assert status == 200
+    assert [item["result"] for item in body["results"]] == [8, -27, 10 ** 90]
+
+
+def test_reports_errors_per_element(client):
+    status, body = batch(client, operation="divide", a=[1, 2, 3, True], b=[2, 0, "x", 1])
+    assert status == 200
+    assert body["errors"] == 3
+    assert body["results"][0] == {"result": 0.5}
+    assert body["results"][1] == {"error": "Division by zero is not allowed"}
+    assert "error" in body["results"][2] and "error" in body["results"][3]
+
+
+@pytest.mark.parametrize("operation, a, b", [
+    ("multiply", [10 ** 3000, 3], [10 ** 3000, 4]),
+    ("divide", [10 ** 400, 3], [1, 4]),
+])
+def test_reports_oversized_results_per_element(client, operation, a, b):
+    status, body = batch(client, operation=operation, a=a, b=b)
+    assert status == 200
+    assert body["results"][0] == {"error": TOO_LARGE}
+    assert body["results"][1] == {"result": a[1] * b[1] if operation == "multiply" else a[1] / b[1]}
+
+
+def test_big_integer_work_is_admitted_by_cost(client, monkeypatch):
+    monkeypatch.setitem(calculator.app.config, "ADMISSION_MAX_COST", 1000)
+    status, body = batch(client, operation="multiply", a=[10 ** 1000] * 20, b=[10 ** 1000] * 20)
+    assert status == 413
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"operation": "pow", "a": [1], "b": [1]}, 400),
+    ({"operation": "add", "a": [1], "b": [1, 2]}, 400),
+    ({"operation": "add", "a": [1]}, 400),
+    ({"operation": "cube"}, 400),
+])
+def test_rejects_malformed_batches(client, body, status):
+    assert client.post("/batch", json=body).status_code == status
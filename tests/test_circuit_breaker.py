@@ -0,0 +1,180 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    """Stands in for time.monotonic and time.sleep, so tests control elapsed time."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Rejected(Exception):
+    """A failure caused by the request, not by the dependency."""
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(circuit_breaker.time, "sleep", clock.sleep)
+    return clock
+
+
+def make_breaker(**kwargs):
+    settings = dict(failure_rate=0.5, slow_call_seconds=1.0, slow_call_rate=0.5, window_size=4,
+                    min_calls=4, open_seconds=10.0, half_open_calls=2,
+                    is_failure=lambda exc: not isinstance(exc, Rejected))
+    settings.update(kwargs)
+    return CircuitBreaker(**settings)
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+def reject():
+    raise Rejected("bad request")
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+
+def test_opens_when_failure_rate_is_reached(clock):
+    breaker = make_breaker()
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == CLOSED  # fewer than min_calls seen
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_open_breaker_fails_fast_with_retry_after(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 4
+    calls = []
+    with pytest.raises(CircuitOpen) as raised:
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert raised.value.retry_after == pytest.approx(6)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_opens_when_slow_call_rate_is_reached(clock):
+    breaker = make_breaker()
+
+    def slow():
+        clock.now += 2
+        return "ok"
+
+    for _ in range(2):
+        breaker.call(lambda: "ok")
+        breaker.call(slow)
+    assert breaker.state == OPEN
+
+
+def test_half_open_closes_after_successful_trials(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    breaker.call(lambda: "ok")
+    assert breaker.state == HALF_OPEN
+    breaker.call(lambda: "ok")
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls_in_window"] == 0
+
+
+def test_half_open_reopens_on_failure(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+    with pytest.raises(CircuitOpen):
+        breaker.call(lambda: "ok")
+
+
+def test_half_open_admits_only_the_trial_calls(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    admitted = []
+
+    def trial():
+        # Another caller arrives while both trials are still running.
+        if len(admitted) < breaker.half_open_calls:
+            admitted.append(True)
+            if len(admitted) == 1:
+                breaker.call(trial)
+            else:
+                with pytest.raises(CircuitOpen):
+                    breaker.call(lambda: "ok")
+        return "ok"
+
+    breaker.call(trial)
+    assert len(admitted) == 2
+    assert breaker.state == CLOSED
+
+
+def test_client_errors_do_not_count_as_failures(clock):
+    breaker = make_breaker()
+    for _ in range(10):
+        with pytest.raises(Rejected):
+            breaker.call(reject)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["failure_rate"] == 0.0
+
+
+def test_client_error_closes_half_open_breaker(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 10
+    for _ in range(2):
+        with pytest.raises(Rejected):
+            breaker.call(reject)
+    assert breaker.state == CLOSED
+
+
+def test_retries_dependency_failures_but_not_client_errors(clock):
+    breaker = make_breaker(min_calls=100, window_size=100)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise ConnectionError("down")
+        return "ok"
+
+    assert breaker.call_with_retries(flaky, retries=2) == "ok"
+    assert len(attempts) == 3
+
+    rejected = []
+    with pytest.raises(Rejected):
+        breaker.call_with_retries(lambda: rejected.append(1) or reject(), retries=2)
+    assert rejected == [1]
+
+
+def test_never_retries_while_open(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    with pytest.raises(CircuitOpen):
+        breaker.call_with_retries(lambda: "ok", retries=5)
+    assert breaker.stats()["rejected"] == 1
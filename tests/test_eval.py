@@ -0,0 +1,57 @@
+import pytest
+
+import app as calculator
+
+
+@pytest.fixture
+def client():
+    return calculator.app.test_client()
+
+
+def evaluate(client, expression, **variables):
+    response = client.post("/eval", json={"expression": expression, "variables": variables})
+    return response.status_code, response.get_json()
+
+
+@pytest.mark.parametrize("expression, variables, result", [
+    ("(a+b)*c^3", {"a": 1, "b": 2, "c": 3}, 81),
+    ("2^-1", {}, 0.5),
+    ("-x + +y", {"x": 2, "y": 5}, 3),
+    ("7 / 2", {}, 3.5),
+])
+def test_evaluates_expressions(client, expression, variables, result):
+    assert evaluate(client, expression, **variables) == (200, {"result": result})
+
+
+@pytest.mark.parametrize("expression, variables", [
+    ("2^8000", {}),
+    ("x^8000", {"x": 2}),
+    ("3^9000", {}),
+])
+def test_large_powers_within_the_digit_limit(client, expression, variables):
+    status, body = evaluate(client, expression, **variables)
+    assert status == 200
+    assert body["result"] == eval(expression.replace("^", "**"), {}, variables)
+
+
+@pytest.mark.parametrize("expression", ["3^9100", "2^9000 * 2^9000", "1e308 * 10", "10^10001"])
+def test_rejects_results_that_are_too_large(client, expression):
+    status, body = evaluate(client, expression)
+    assert status == 400
+    assert "sys.set_int_max_str_digits" not in body["error"]
+
+
+@pytest.mark.parametrize("expression", ["-" * 990 + "1", "(1+" * 120 + "1" + ")" * 120])
+def test_rejects_deeply_nested_expressions(client, expression):
+    assert evaluate(client, expression) == (400, {"error": "Expression is nested too deeply"})
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("1/0", "Division by zero is not allowed"),
+    ("__import__('os')", "Unsupported syntax in expression: Call"),
+    ("1 +", "Invalid expression syntax"),
+    ("x + 1", "Missing variables: x"),
+])
+def test_rejects_invalid_expressions(client, expression, error):
+    assert evaluate(client, expression) == (400, {"error": error})
+
@@ -0,0 +1,224 @@
+"""
+Keyset pagination must return every todo exactly once, in order, whatever
+the ordering and page size, with cursors passed between pages the way the
+API passes them. The PostgREST query built by page_query, the SQL of
+SQLiteTodoRepository.page and the local replica must agree.
+"""
+import json
+import re
+
+import pytest
+
+from todo_queries import decode_cursor, encode_cursor, page_query, parse_todo_query, split_page
+from todo_replica import ReplicaUnavailable, TodoReplica
+from todo_repository import SQLiteTodoRepository
+
+PRIORITIES = ["High", "Low", "Medium", None]
+ORDERS = ["id", "id.desc", "priority", "priority.desc", "is_complete", "is_complete.desc", "task"]
+
+
+def make_rows():
+    # Few distinct values, so pages end in the middle of runs of equal values.
+    return [
+        {"id": i, "task": f"task {i % 5}", "is_complete": i % 3 == 0, "priority": PRIORITIES[i % 4]}
+        for i in range(1, 24)
+    ]
+
+
+class _Reversed:
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def sort_key(row, column, descending):
+    value = row[column]
+    # Postgres: nulls last ascending, first descending; ties by ascending id.
+    if descending:
+        return (value is not None, _Reversed(value) if value is not None else 0, row["id"])
+    return (value is None, value if value is not None else 0, row["id"])
+
+
+def expected_ids(rows, options):
+    rows = [row for row in rows if all(row[column] == value for column, value in options["filters"].items())]
+    return [row["id"] for row in sorted(rows, key=lambda row: sort_key(row, options["order"], options["descending"]))]
+
+
+def _literal(text):
+    if text.startswith('"'):
+        return json.loads(text)
+    if text in ("true", "false"):
+        return text == "true"
+    return float(text) if "." in text else int(text)
+
+
+def _split_top_level(text):
+    parts, depth, start = [], 0, 0
+    for position, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:position])
+            start = position + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _condition(text):
+    """Evaluates the PostgREST filters that after_filter produces."""
+    if text.startswith("and(") and text.endswith(")"):
+        conditions = [_condition(part) for part in _split_top_level(text[4:-1])]
+        return lambda row: all(condition(row) for condition in conditions)
+    column, operator, operand = re.fullmatch(r"(\w+)\.(not\.is|is|eq|gt|lt)\.(.*)", text).groups()
+    if operator == "is":
+        return lambda row: row[column] is None
+    if operator == "not.is":
+        return lambda row: row[column] is not None
+    value = _literal(operand)
+    compare = {"eq": lambda a, b: a == b, "gt": lambda a, b: a > b, "lt": lambda a, b: a < b}[operator]
+    return lambda row: row[column] is not None and compare(row[column], value)
+
+
+class FakeTable:
+    """The slice of the PostgREST query builder that page_query uses, over a list of rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.conditions = []
+        self.orders = []
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.conditions.append(lambda row: row[column] == value)
+        return self
+
+    def gt(self, column, value):
+        self.conditions.append(lambda row: row[column] > value)
+        return self
+
+    def lt(self, column, value):
+        self.conditions.append(lambda row: row[column] < value)
+        return self
+
+    def or_(self, filters):
+        alternatives = [_condition(part) for part in _split_top_level(filters)]
+        self.conditions.append(lambda row: any(alternative(row) for alternative in alternatives))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(condition(row) for condition in self.conditions)]
+        (column, descending), *_ = self.orders
+        rows.sort(key=lambda row: sort_key(row, column, descending))
+        return type("Response", (), {"data": [dict(row) for row in rows[:self.row_limit]]})
+
+
+def walk(fetch_page, options, limit):
+    """Follows next cursors through their encoded form, as API clients do."""
+    ids, after = [], None
+    while True:
+        rows, cursor = fetch_page(limit, after, options)
+        ids.extend(row["id"] for row in rows)
+        if cursor is None:
+            return ids
+        after = decode_cursor(str(encode_cursor(cursor)), options)
+
+
+def postgrest_page(rows):
+    return lambda limit, after, options: split_page(
+        page_query(FakeTable(rows), limit, after, options).execute().data, limit, options
+    )
+
+
+@pytest.mark.parametrize("order", ORDERS)
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_postgrest_pages_visit_every_todo_in_order(order, limit):
+    rows = make_rows()
+    options = parse_todo_query({"order": order})
+    assert walk(postgrest_page(rows), options, limit) == expected_ids(rows, options)
+
+
+@pytest.mark.parametrize("filters", [{"is_complete": "true"}, {"priority": "Low"}])
+def test_postgrest_pages_apply_filters(filters):
+    rows = make_rows()
+    options = parse_todo_query({"order": "priority.desc", **filters})
+    expected = expected_ids(rows, options)
+    assert expected
+    assert walk(postgrest_page(rows), options, 2) == expected
+
+
+@pytest.mark.parametrize("order", ORDERS)
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_sqlite_pages_agree_with_postgrest(tmp_path, order, limit):
+    repository = SQLiteTodoRepository(str(tmp_path / "todos.db"))
+    rows = repository.insert([{key: value for key, value in row.items() if key != "id"} for row in make_rows()])
+    for filters in ({}, {"priority": "Low"}):
+        options = parse_todo_query({"order": order, **filters})
+        assert walk(repository.page, options, limit) == walk(postgrest_page(rows), options, limit)
+
+
+def load_replica(rows):
+    replica = TodoReplica(max_staleness=60)
+    replica.begin_load()
+    replica.load([dict(row) for row in rows])
+    return replica
+
+
+@pytest.mark.parametrize("order", ["id", "id.desc"])
+@pytest.mark.parametrize("filters", [{}, {"is_complete": "true"}, {"priority": "Low"}])
+@pytest.mark.parametrize("limit", [1, 3, 100])
+def test_replica_pages_agree_with_postgrest(order, filters, limit):
+    rows = make_rows()
+    options = parse_todo_query({"order": order, **filters})
+    expected = walk(postgrest_page(rows), options, limit)
+    assert walk(load_replica(rows).page, options, limit) == expected
+
+
+def test_replica_pages_follow_changes():
+    rows = make_rows()
+    replica = load_replica(rows)
+    created = {"id": 50, "task": "new", "is_complete": False, "priority": "High"}
+    replica.apply_change({"data": {"type": "INSERT", "record": created}})
+    replica.apply_change({"data": {"type": "DELETE", "old_record": {"id": 5}}})
+    rows = [row for row in rows if row["id"] != 5] + [created]
+    for order in ("id", "id.desc"):
+        options = parse_todo_query({"order": order})
+        assert walk(replica.page, options, 4) == expected_ids(rows, options)
+
+
+@pytest.mark.parametrize("order", ["priority", "is_complete.desc", "task"])
+def test_replica_leaves_other_orderings_to_the_database(order):
+    with pytest.raises(ReplicaUnavailable):
+        load_replica(make_rows()).page(3, None, parse_todo_query({"order": order}))
+
+
+def test_replica_waits_for_the_change_events_of_its_own_writes():
+    replica = load_replica(make_rows())
+    options = parse_todo_query({})
+    replica.invalidate([7])
+    with pytest.raises(ReplicaUnavailable):
+        replica.get(7, options)
+    with pytest.raises(ReplicaUnavailable):
+        replica.page(3, None, options)
+    assert replica.get(8, options)["id"] == 8
+    updated = {"id": 7, "task": "changed", "is_complete": True, "priority": None}
+    replica.apply_change({"data": {"type": "UPDATE", "record": updated}})
+    assert replica.get(7, options) == updated
+    assert replica.page(3, None, options)[1] == 3
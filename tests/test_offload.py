@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+import app as calculator
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Offload every computation that isn't served from the cache.
+    monkeypatch.setitem(calculator.app.config, "OFFLOAD_MIN_COST", 0)
+    monkeypatch.setitem(calculator.app.config, "OFFLOAD_WORKERS", 1)
+    calculator.result_cache.clear()
+    yield calculator.app.test_client()
+    calculator._shutdown_offload_pool()
+    calculator._offload_pool = None
+
+
+def test_offloaded_results_match_inline_ones(client):
+    response = client.get("/cube?x=123456789")
+    assert response.status_code == 200
+    assert response.get_json() == {"result": 123456789 ** 3}
+
+
+def test_pool_is_replaced_after_a_worker_dies(client):
+    assert client.get("/cube?x=11").status_code == 200
+    pool, _ = calculator._get_offload_pool()
+    with pytest.raises(Exception):
+        pool.submit(os._exit, 1).result()
+
+    response = client.get("/cube?x=12")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    response = client.get("/cube?x=13")
+    assert response.status_code == 200
+    assert response.get_json() == {"result": 13 ** 3}
+    assert calculator._offload_pool is not pool
@@ -0,0 +1,66 @@
+import pytest
+
+from todo_queries import build_todo_record, is_client_error
+from todo_repository import SQLiteTodoRepository, TodoRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteTodoRepository(str(tmp_path / "todos.db"))
+    repository.insert([{"task": "first", "priority": "High"}, {"task": "second", "priority": None}])
+    return repository
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Partial(TodoRepository):
+        def insert(self, records):
+            return records
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_sqlite_round_trip(repository):
+    row = repository.get(1)
+    assert row["task"] == "first"
+    assert row["is_complete"] is False
+    assert repository.update(1, {"is_complete": True})["is_complete"] is True
+    assert repository.get(1, {"select": "id,task", "filters": {"is_complete": True}}) == {"id": 1, "task": "first"}
+    assert repository.delete(2)["task"] == "second"
+    assert repository.get(2) is None
+    assert repository.update(2, {"task": "gone"}) is None
+
+
+def test_sqlite_bulk_selection(repository):
+    repository.insert([{"task": "third", "priority": "High"}])
+    updated = repository.update_where({"is_complete": True}, {"ids": None, "filters": {"priority": "High"}})
+    assert sorted(row["id"] for row in updated) == [1, 3]
+    deleted = repository.delete_where({"ids": [1, 2], "filters": {"is_complete": True}})
+    assert [row["id"] for row in deleted] == [1]
+
+
+@pytest.mark.parametrize("call", [
+    lambda repository: repository.update(1, {"task": None}),
+    lambda repository: repository.insert([{"task": "t", "priority": {"x": 1}}]),
+    lambda repository: repository.update(1, {"nosuch": 1}),
+    lambda repository: repository.page(10, None, {"select": "*", "filters": {}, "order": "nosuch", "descending": False}),
+])
+def test_rejected_requests_are_client_errors(repository, call):
+    with pytest.raises(Exception) as raised:
+        call(repository)
+    assert is_client_error(raised.value)
+
+
+def test_store_failures_are_not_client_errors():
+    class APIError(Exception):
+        code = "08006"
+
+    assert not is_client_error(APIError("connection failure"))
+    assert not is_client_error(ConnectionError("down"))
+
+
+@pytest.mark.parametrize("priority", [{"x": 1}, 3, ["High"]])
+def test_priority_must_be_a_string(priority):
+    with pytest.raises(ValueError):
+        build_todo_record({"task": "t", "priority": priority})
+    assert build_todo_record({"task": "t", "priority": None})["priority"] is None
@@ -0,0 +1,200 @@
+import json
+import time
+import os
+
+import pytest
+
+from write_behind import QueueFull, WriteBehindBuffer
+
+
+class Outage(Exception):
+    pass
+
+
+class Rejected(Exception):
+    pass
+
+
+class Store:
+    """insert_many for the buffer; rejects records marked bad, fails everything while down."""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.calls = 0
+
+    def insert_many(self, records):
+        self.calls += 1
+        if self.down:
+            raise Outage("store unreachable")
+        if any(record.get("bad") for record in records):
+            raise Rejected("invalid record")
+        self.rows.extend(records)
+
+
+@pytest.fixture(autouse=True)
+def manual_flushes(monkeypatch):
+    # No background flusher: tests call flush() themselves.
+    monkeypatch.setattr(WriteBehindBuffer, "_run", lambda self: None)
+
+
+@pytest.fixture
+def store():
+    return Store()
+
+
+def make_buffer(store, spill_dir, **kwargs):
+    return WriteBehindBuffer(store.insert_many, str(spill_dir), batch_size=4, interval=0,
+                             is_outage=lambda exc: isinstance(exc, Outage), **kwargs)
+
+
+def spill_files(spill_dir):
+    return sorted(name for name in os.listdir(spill_dir) if name.startswith("spill-"))
+
+
+def test_flush_inserts_in_batches(store, tmp_path):
+    buffer = make_buffer(store, tmp_path)
+    for n in range(10):
+        buffer.add({"n": n})
+    buffer.flush()
+    assert [record["n"] for record in store.rows] == list(range(10))
+    assert store.calls == 3
+    assert buffer.stats()["pending"] == 0
+
+
+def test_outage_keeps_records_queued(store, tmp_path):
+    buffer = make_buffer(store, tmp_path)
+    store.down = True
+    for n in range(6):
+        buffer.add({"n": n})
+    buffer.flush()
+    assert buffer.pending() == 6
+    assert buffer.stats()["failed_flushes"] == 1
+    store.down = False
+    buffer.flush()
+    assert [record["n"] for record in store.rows] == list(range(6))
+
+
+def test_rejected_records_are_dead_lettered(store, tmp_path):
+    buffer = make_buffer(store, tmp_path)
+    for n in range(8):
+        buffer.add({"n": n, "bad": n in (1, 6)})
+    buffer.flush()
+    assert [record["n"] for record in store.rows] == [0, 2, 3, 4, 5, 7]
+    assert buffer.pending() == 0
+    with open(buffer.dead_letter_path) as dead_letter:
+        entries = [json.loads(line) for line in dead_letter]
+    assert [entry["record"]["n"] for entry in entries] == [1, 6]
+    assert entries[0]["error"] == "invalid record"
+    assert buffer.stats()["dead_lettered"] == 2
+
+
+def test_full_queue_refuses_records(store, tmp_path):
+    buffer = make_buffer(store, tmp_path, max_pending=3)
+    store.down = True
+    for n in range(3):
+        buffer.add({"n": n})
+    with pytest.raises(QueueFull):
+        buffer.add({"n": 3})
+    assert buffer.stats()["refused"] == 1
+    store.down = False
+    buffer.flush()
+    buffer.add({"n": 3})
+
+
+def test_restarted_process_with_the_same_pid_adopts_the_spill(store, tmp_path):
+    crashed = make_buffer(store, tmp_path)
+    for n in range(6):
+        crashed.add({"n": n})
+    crashed.flush()
+    store.down = True
+    for n in range(6, 9):
+        crashed.add({"n": n})
+    crashed.flush()
+    store.down = False
+
+    # A new buffer in this process stands in for a restarted worker given the same pid.
+    restarted = make_buffer(store, tmp_path)
+    restarted.add({"n": 9})
+    assert restarted.pending() == 4  # the three unflushed records, then the new one
+    assert spill_files(tmp_path) == [os.path.basename(restarted.spill_path)]
+    restarted.flush()
+    assert [record["n"] for record in store.rows] == list(range(10))
+
+
+def test_truncated_last_line_is_skipped(store, tmp_path):
+    crashed = make_buffer(store, tmp_path)
+    crashed.add({"n": 0})
+    crashed.add({"n": 1})
+    with open(crashed.spill_path, "a") as spill:
+        spill.write('{"provisional_id": "cut", "record": {"n"')
+
+    restarted = make_buffer(store, tmp_path)
+    restarted.add({"n": 2})
+    restarted.flush()
+    assert [record["n"] for record in store.rows] == [0, 1, 2]
+
+
+def test_orphans_of_dead_processes_are_adopted(store, tmp_path, monkeypatch):
+    monkeypatch.setattr("write_behind._process_alive", lambda pid: pid == os.getpid())
+    lines = [json.dumps({"provisional_id": f"p{n}", "record": {"n": n}}) + "\n" for n in range(3)]
+    lines.append(json.dumps({"flushed": ["p0"]}) + "\n")
+    (tmp_path / "spill-999999-0123abcd.jsonl").write_text("".join(lines))
+    (tmp_path / "spill-999998.jsonl").write_text(lines[0])  # written before spill names had tokens
+
+    buffer = make_buffer(store, tmp_path)
+    buffer.add({"n": 3})
+    assert spill_files(tmp_path) == [os.path.basename(buffer.spill_path)]
+    buffer.flush()
+    assert sorted(record["n"] for record in store.rows) == [0, 1, 2, 3]
+
+
+def test_live_processes_keep_their_spill(store, tmp_path, monkeypatch):
+    monkeypatch.setattr("write_behind._process_alive", lambda pid: True)
+    record = json.dumps({"provisional_id": "p0", "record": {"n": 0}}) + "\n"
+    (tmp_path / "spill-999999-0123abcd.jsonl").write_text(record)
+    buffer = make_buffer(store, tmp_path)
+    buffer.add({"n": 1})
+    assert buffer.pending() == 1
+    assert "spill-999999-0123abcd.jsonl" in spill_files(tmp_path)
+
+
+def test_log_is_compacted(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(WriteBehindBuffer, "COMPACT_SLACK", 4)
+    buffer = make_buffer(store, tmp_path)
+    for n in range(20):
+        buffer.add({"n": n})
+    buffer.flush()
+    with open(buffer.spill_path) as spill:
+        assert len(spill.readlines()) <= buffer.COMPACT_SLACK
+
+    # Nothing flushed is replayed from the compacted log.
+    restarted = make_buffer(store, tmp_path)
+    restarted.add({"n": 21})
+    assert restarted.pending() == 1
+
+
+def test_flusher_survives_errors(store, tmp_path, monkeypatch):
+    monkeypatch.undo()  # run the real background flusher
+    failures = [RuntimeError("on_flush failed")]
+
+    def on_flush():
+        if failures:
+            raise failures.pop()
+
+    buffer = make_buffer(store, tmp_path, on_flush=on_flush)
+    buffer.interval = 0.01
+    for n in range(4):
+        buffer.add({"n": n})
+    deadline = time.monotonic() + 5
+    while buffer.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for n in range(4, 8):
+        buffer.add({"n": n})
+    while buffer.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = buffer.stats()
+    assert stats["pending"] == 0
+    assert stats["flusher_alive"]
+    assert stats["failed_flushes"] >= 1
+    assert [record["n"] for record in store.rows] == list(range(8))
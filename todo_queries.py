@@ -0,0 +1,218 @@
+"""Query building and validation for the todo API, shared by its sync and async variants.
+
+Nothing here talks to Supabase: functions take a request builder (e.g.
+``client.table("todos")``) and return it narrowed, or work on plain rows.
+"""
+import base64
+import binascii
+import json
+import re
+import sqlite3
+
+TODOS_PAGE_SIZE = 100
+TODOS_MAX_PAGE_SIZE = 1000
+BULK_MAX_ITEMS = 10000
+BULK_INSERT_CHUNK_SIZE = 500
+
+_COLUMN_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def build_todo_record(data):
+    """
+    Validates a todo payload and prepares the record for Supabase.
+    Raises ValueError with a client-facing message if the payload is invalid.
+    """
+    if not isinstance(data, dict) or 'task' not in data:
+        raise ValueError("Missing 'task' in JSON body")
+
+    new_task = str(data['task']).strip()
+    if not new_task:
+        raise ValueError("Task cannot be empty")
+
+    priority = data.get("priority", "Medium")
+    if priority is not None and not isinstance(priority, str):
+        raise ValueError("'priority' must be a string")
+
+    return {
+        "task": new_task,
+        "is_complete": False,
+        "priority": priority
+    }
+
+
+def is_client_error(exc):
+    """
+    Whether a failed todo query was rejected because of the request itself
+    (an unknown column in 'fields' or 'order', a bad value) rather than a
+    store problem: PostgREST errors with SQLSTATE class 22, 23 or 42 or a
+    PGRST1xx code, and on the SQLite backend its ValueError for unknown
+    columns and the sqlite3 errors for constraint violations and values it
+    can't bind.
+    """
+    code = getattr(exc, "code", None)
+    if isinstance(code, str) and (code[:2] in ("22", "23", "42") or code.startswith("PGRST1")):
+        return True
+    return isinstance(exc, (ValueError, sqlite3.IntegrityError, sqlite3.ProgrammingError,
+                            sqlite3.InterfaceError, sqlite3.DataError))
+
+
+def parse_todo_query(args):
+    """
+    Translates the 'fields', 'is_complete', 'priority' and 'order' query
+    parameters into options for todos_query. Raises ValueError on bad input.
+    The 'id' column (and the ordering column) is always selected because
+    cursors are built from it.
+    """
+    order = args.get("order", "id")
+    order_column, _, direction = order.partition(".")
+    if not _COLUMN_NAME.match(order_column) or direction not in ("", "asc", "desc"):
+        raise ValueError("'order' must be a column name, optionally followed by '.asc' or '.desc'")
+
+    select = "*"
+    if "fields" in args:
+        columns = [column.strip() for column in args["fields"].split(",") if column.strip()]
+        if not columns or not all(_COLUMN_NAME.match(column) for column in columns):
+            raise ValueError("'fields' must be a comma-separated list of column names")
+        for column in ("id", order_column):
+            if column not in columns:
+                columns.append(column)
+        select = ",".join(columns)
+
+    filters = {}
+    if "is_complete" in args:
+        is_complete = args["is_complete"].lower()
+        if is_complete not in ("true", "false"):
+            raise ValueError("'is_complete' must be 'true' or 'false'")
+        filters["is_complete"] = is_complete == "true"
+    if "priority" in args:
+        filters["priority"] = args["priority"]
+
+    return {
+        "select": select,
+        "filters": filters,
+        "order": order_column,
+        "descending": direction == "desc",
+    }
+
+
+DEFAULT_TODO_QUERY = parse_todo_query({})
+
+
+def query_key(options):
+    """Hashable form of parsed query options, for cache keys."""
+    return (
+        options["select"],
+        tuple(sorted(options["filters"].items())),
+        options["order"],
+        options["descending"],
+    )
+
+
+def todos_query(table, options):
+    """Builds the Supabase select for the given projection and filters."""
+    query = table.select(options["select"])
+    for column, value in options["filters"].items():
+        query = query.eq(column, value)
+    return query
+
+
+def postgrest_literal(value):
+    """Formats a value for use inside a PostgREST 'or' filter."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def after_filter(column, descending, value, last_id):
+    """
+    Builds the keyset condition for rows after (value, last_id) when ordering
+    by 'column' with 'id' as the ascending tie-breaker. Postgres sorts nulls
+    last in ascending and first in descending order.
+    """
+    if value is None:
+        same_value = f"and({column}.is.null,id.gt.{last_id})"
+        return f"{column}.not.is.null,{same_value}" if descending else same_value
+    literal = postgrest_literal(value)
+    same_value = f"and({column}.eq.{literal},id.gt.{last_id})"
+    if descending:
+        return f"{column}.lt.{literal},{same_value}"
+    return f"{column}.gt.{literal},{column}.is.null,{same_value}"
+
+
+def encode_cursor(cursor):
+    """Cursors are plain ids when ordering by id, and opaque tokens otherwise."""
+    if cursor is None or isinstance(cursor, int):
+        return cursor
+    return base64.urlsafe_b64encode(json.dumps(list(cursor)).encode()).decode()
+
+
+def decode_cursor(after, options):
+    if options["order"] == "id":
+        return int(after)
+    try:
+        value, last_id = json.loads(base64.urlsafe_b64decode(after.encode()))
+        return value, int(last_id)
+    except (TypeError, binascii.Error):
+        raise ValueError(after)
+
+
+def page_query(table, limit, after=None, options=DEFAULT_TODO_QUERY):
+    """
+    Builds the query for up to 'limit' todos following the decoded cursor
+    'after', in the order given by 'options'. It asks for one extra row,
+    which split_page uses to tell whether another page exists.
+    """
+    query = todos_query(table, options)
+    column, descending = options["order"], options["descending"]
+    if column == "id":
+        query = query.order("id", desc=descending)
+        if after is not None:
+            query = query.lt("id", after) if descending else query.gt("id", after)
+    else:
+        query = query.order(column, desc=descending).order("id")
+        if after is not None:
+            query = query.or_(after_filter(column, descending, *after))
+    return query.limit(limit + 1)
+
+
+def split_page(rows, limit, options=DEFAULT_TODO_QUERY):
+    """Returns the page's rows and the cursor for the next page (None on the last page)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        column = options["order"]
+        return rows, last["id"] if column == "id" else (last[column], last["id"])
+    return rows, None
+
+
+def parse_bulk_selection(args):
+    """
+    Reads the todos a bulk update/delete applies to: the 'ids' (comma-separated)
+    and/or the 'is_complete' and 'priority' filters given in the query string.
+    Raises ValueError if the selection is invalid or empty.
+    """
+    filters = parse_todo_query(args)["filters"]
+    ids = None
+    if "ids" in args:
+        try:
+            ids = [int(todo_id) for todo_id in args["ids"].split(",")]
+        except ValueError:
+            raise ValueError("'ids' must be a comma-separated list of integers")
+        if len(ids) > BULK_MAX_ITEMS:
+            raise ValueError(f"At most {BULK_MAX_ITEMS} ids can be given at once")
+    elif not filters:
+        # Never let a missing selection turn into "every todo".
+        raise ValueError("Select todos with 'ids', 'is_complete' or 'priority'")
+    return {"ids": ids, "filters": filters}
+
+
+def bulk_target(query, selection):
+    """Restricts a bulk update/delete to a selection from parse_bulk_selection."""
+    if selection["ids"] is not None:
+        query = query.in_("id", selection["ids"])
+    for column, value in selection["filters"].items():
+        query = query.eq(column, value)
+    return query
@@ -0,0 +1,267 @@
+"""In-process replica of the todos table, kept current by a change feed.
+
+The replica is loaded with a paged scan and then follows INSERT/UPDATE/DELETE
+events shaped like Supabase realtime ``postgres_changes`` payloads. Reads are
+answered from memory while the feed has been confirmed live within
+``max_staleness`` seconds; otherwise :class:`ReplicaUnavailable` is raised and
+the caller reads from Supabase instead.
+
+Rows only ever come from the feed, which delivers changes in commit order. A
+write made by this process invalidates the rows it touched: they are read
+from Supabase until their change event arrives, so a response from the write
+can't overwrite a newer version of the row.
+
+Pages are served in id order only, walking a sorted index of ids, so a page
+costs O(limit) rather than a sort of the whole table. Other orderings raise
+ReplicaUnavailable.
+"""
+import asyncio
+import bisect
+import threading
+import time
+
+from todo_queries import TODOS_MAX_PAGE_SIZE, page_query, split_page
+
+
+class ReplicaUnavailable(Exception):
+    """The replica can't answer this read; ask Supabase."""
+
+
+class TodoReplica:
+    """Thread-safe map of todo id -> row, fed by apply_change."""
+
+    # Non-matching rows a filtered page may skip before the read goes to Supabase.
+    SCAN_BUDGET = 10000
+
+    def __init__(self, max_staleness=5.0, on_change=None):
+        self.max_staleness = max_staleness
+        self.on_change = on_change
+        self.ready = False
+        self.confirmed_at = None
+        self.applied = 0
+        self._rows = {}
+        self._ids = []  # sorted keys of _rows
+        self._invalidated = {}  # todo id -> monotonic deadline for its change event
+        self._buffer = None  # changes that arrive while a scan is in progress
+        self._lock = threading.Lock()
+
+    # --- Feeding ---
+
+    def begin_load(self):
+        """Stops serving reads and buffers changes until load() is called."""
+        with self._lock:
+            self.ready = False
+            self._buffer = []
+
+    def load(self, rows):
+        """Replaces the contents with a full scan, then replays changes buffered during it."""
+        with self._lock:
+            self._rows = {row["id"]: row for row in rows}
+            self._ids = sorted(self._rows)
+            self._invalidated.clear()
+            for payload in self._buffer or ():
+                self._apply(payload)
+            self._buffer = None
+            self.ready = True
+            self.confirmed_at = time.monotonic()
+        if self.on_change:
+            self.on_change()
+
+    def apply_change(self, payload):
+        """Applies one realtime postgres_changes payload."""
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.append(payload)
+                return
+            todo_id = self._apply(payload)
+        if self.on_change:
+            self.on_change(todo_id)
+
+    def _apply(self, payload):
+        data = payload["data"]
+        self.applied += 1
+        if data["type"] == "DELETE":
+            todo_id = data["old_record"]["id"]
+            if self._rows.pop(todo_id, None) is not None:
+                del self._ids[bisect.bisect_left(self._ids, todo_id)]
+        else:
+            record = data["record"]
+            todo_id = record["id"]
+            if todo_id not in self._rows:
+                bisect.insort(self._ids, todo_id)
+            self._rows[todo_id] = record
+        self._invalidated.pop(todo_id, None)
+        return todo_id
+
+    def invalidate(self, todo_ids):
+        """
+        Marks todos this process just wrote: reads touching them raise
+        ReplicaUnavailable until their change event is applied, or for at
+        most max_staleness seconds.
+        """
+        deadline = time.monotonic() + self.max_staleness
+        with self._lock:
+            for todo_id in todo_ids:
+                self._invalidated[todo_id] = deadline
+
+    def _check_valid(self, todo_id=None):
+        """Raises ReplicaUnavailable if todo_id (any todo, if None) awaits its change event. Caller holds _lock."""
+        if not self._invalidated:
+            return
+        now = time.monotonic()
+        if todo_id is None:
+            for expired in [key for key, deadline in self._invalidated.items() if deadline < now]:
+                del self._invalidated[expired]
+            if self._invalidated:
+                raise ReplicaUnavailable("waiting for changes made by this process")
+        elif todo_id in self._invalidated:
+            if self._invalidated[todo_id] >= now:
+                raise ReplicaUnavailable("waiting for a change made by this process")
+            del self._invalidated[todo_id]
+
+    def confirm(self):
+        """Records that the feed is known to be live as of now."""
+        self.confirmed_at = time.monotonic()
+
+    def is_fresh(self):
+        confirmed_at = self.confirmed_at
+        return self.ready and confirmed_at is not None and time.monotonic() - confirmed_at <= self.max_staleness
+
+    # --- Reads ---
+
+    def get(self, todo_id, options):
+        """Returns the projected todo, or None if it doesn't exist or match the filters."""
+        if not self.is_fresh():
+            raise ReplicaUnavailable("replica is not live")
+        with self._lock:
+            self._check_valid(todo_id)
+            row = self._rows.get(todo_id)
+        if row is None or not _matches(row, options["filters"]):
+            return None
+        return _project(row, options["select"])
+
+    def page(self, limit, after, options):
+        """
+        Same contract as page_query + split_page: the page's rows and the next
+        cursor. Walks the id index from the cursor, so only 'id' ordering is
+        served, and a filter that skips more than SCAN_BUDGET rows gives up.
+        """
+        if options["order"] != "id":
+            raise ReplicaUnavailable(f"can't page by {options['order']!r} without sorting")
+        if not self.is_fresh():
+            raise ReplicaUnavailable("replica is not live")
+        descending, filters = options["descending"], options["filters"]
+        rows, skipped = [], 0
+        with self._lock:
+            self._check_valid()
+            ids = self._ids
+            if descending:
+                start = len(ids) if after is None else bisect.bisect_left(ids, after)
+                walk = range(start - 1, -1, -1)
+            else:
+                start = 0 if after is None else bisect.bisect_right(ids, after)
+                walk = range(start, len(ids))
+            for position in walk:
+                row = self._rows[ids[position]]
+                if not _matches(row, filters):
+                    skipped += 1
+                    if skipped > self.SCAN_BUDGET:
+                        raise ReplicaUnavailable("filter skips too many rows")
+                    continue
+                rows.append(row)
+                if len(rows) > limit:
+                    break
+        rows, cursor = split_page(rows, limit, options)
+        return [_project(row, options["select"]) for row in rows], cursor
+
+    def stats(self):
+        confirmed_at = self.confirmed_at
+        return {
+            "ready": self.ready,
+            "fresh": self.is_fresh(),
+            "rows": len(self._rows),
+            "awaiting_changes": len(self._invalidated),
+            "changes_applied": self.applied,
+            "seconds_since_confirmed": None if confirmed_at is None else round(time.monotonic() - confirmed_at, 3),
+            "max_staleness": self.max_staleness,
+        }
+
+
+def _matches(row, filters):
+    try:
+        return all(row[column] == value for column, value in filters.items())
+    except KeyError as e:
+        raise ReplicaUnavailable(f"unknown column {e}")
+
+
+def _project(row, select):
+    if select == "*":
+        return dict(row)
+    try:
+        return {column: row[column] for column in select.split(",")}
+    except KeyError as e:
+        raise ReplicaUnavailable(f"unknown column {e}")
+
+
+# --- Supabase realtime feed ---
+
+def start_realtime_feed(replica, supabase_url, supabase_key, table="todos", check_interval=1.0):
+    """
+    Runs the realtime subscription for replica on a daemon thread with its own
+    event loop (realtime needs the async client). The replica is reloaded with
+    a paged scan whenever the channel (re)joins, since realtime doesn't replay
+    events missed while disconnected.
+    """
+    thread = threading.Thread(
+        target=lambda: asyncio.run(_follow(replica, supabase_url, supabase_key, table, check_interval)),
+        name="todo-replica",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+async def _follow(replica, supabase_url, supabase_key, table, check_interval):
+    from supabase import acreate_client
+
+    while True:
+        client = None
+        try:
+            client = await acreate_client(supabase_url, supabase_key)
+            channel = client.channel(f"{table}-replica")
+            channel.on_postgres_changes("*", schema="public", table=table, callback=replica.apply_change)
+            replica.begin_load()
+            await channel.subscribe()
+            live = False
+            while True:
+                joined = client.realtime.is_connected and channel.is_joined
+                if joined and not live:
+                    # Changes delivered before the scan starts are already in
+                    # it; only those arriving during the scan are replayed.
+                    replica.begin_load()
+                    replica.load(await _scan(client, table))
+                elif not joined and live:
+                    replica.begin_load()
+                live = joined
+                if live:
+                    replica.confirm()
+                await asyncio.sleep(check_interval)
+        except Exception:
+            replica.begin_load()
+        finally:
+            if client is not None:
+                try:
+                    await client.realtime.close()
+                except Exception:
+                    pass
+        await asyncio.sleep(check_interval)
+
+
+async def _scan(client, table):
+    rows, cursor = [], None
+    while True:
+        response = await page_query(client.table(table), TODOS_MAX_PAGE_SIZE, cursor).execute()
+        page, cursor = split_page(response.data, TODOS_MAX_PAGE_SIZE)
+        rows.extend(page)
+        if cursor is None:
+            return rows
@@ -0,0 +1,296 @@
+"""Storage backends for the todo API.
+
+The handlers in app1.py talk to a TodoRepository instead of Supabase, so the
+API can run against Supabase or against an embedded SQLite database (for
+local benchmarks and single-node deployments). Query options, cursors and
+bulk selections are the ones produced by todo_queries, and both backends
+return rows as plain dicts with the same ordering and paging semantics.
+"""
+import abc
+import os
+import sqlite3
+import threading
+
+from todo_queries import (
+    DEFAULT_TODO_QUERY,
+    bulk_target,
+    page_query,
+    split_page,
+    todos_query,
+)
+
+
+class TodoRepository(abc.ABC):
+    """Interface of a todos store. Missing todos are reported as None, never raised."""
+
+    @abc.abstractmethod
+    def insert(self, records):
+        """Stores records and returns the created rows."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def page(self, limit, after=None, options=DEFAULT_TODO_QUERY):
+        """Returns up to 'limit' rows after the decoded cursor 'after', and the next cursor."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, todo_id, options=DEFAULT_TODO_QUERY):
+        """Returns the todo if it exists and matches the filters in options."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, todo_id, data):
+        """Applies data to one todo and returns the updated row."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, todo_id):
+        """Deletes one todo and returns the removed row."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_where(self, data, selection):
+        """Applies data to every todo in a parse_bulk_selection selection; returns the rows."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_where(self, selection):
+        """Deletes every todo in the selection and returns the removed rows."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def ping(self):
+        """Runs the cheapest query that proves the store is reachable."""
+        raise NotImplementedError
+
+
+class SupabaseTodoRepository(TodoRepository):
+    """Todos in a Supabase table. get_client is called for every operation."""
+
+    def __init__(self, get_client, table="todos"):
+        self.get_client = get_client
+        self.table_name = table
+
+    def _table(self):
+        return self.get_client().table(self.table_name)
+
+    def insert(self, records):
+        return self._table().insert(records).execute().data
+
+    def page(self, limit, after=None, options=DEFAULT_TODO_QUERY):
+        return split_page(page_query(self._table(), limit, after, options).execute().data, limit, options)
+
+    def get(self, todo_id, options=DEFAULT_TODO_QUERY):
+        rows = todos_query(self._table(), options).eq("id", todo_id).execute().data
+        return rows[0] if rows else None
+
+    def update(self, todo_id, data):
+        rows = self._table().update(data).eq("id", todo_id).execute().data
+        return rows[0] if rows else None
+
+    def delete(self, todo_id):
+        rows = self._table().delete().eq("id", todo_id).execute().data
+        return rows[0] if rows else None
+
+    def update_where(self, data, selection):
+        return bulk_target(self._table().update(data), selection).execute().data
+
+    def delete_where(self, selection):
+        return bulk_target(self._table().delete(), selection).execute().data
+
+    def ping(self):
+        self._table().select("id").limit(1).execute()
+
+
+class SQLiteTodoRepository(TodoRepository):
+    """
+    Todos in an embedded SQLite database in WAL mode, so readers don't block
+    the writer. Each thread (and each forked process) opens its own connection.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS todos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+            task TEXT NOT NULL,
+            is_complete BOOLEAN NOT NULL DEFAULT 0,
+            priority TEXT
+        );
+        CREATE INDEX IF NOT EXISTS todos_is_complete ON todos (is_complete, id);
+        CREATE INDEX IF NOT EXISTS todos_priority ON todos (priority, id);
+    """
+    BOOLEAN_COLUMNS = frozenset({"is_complete"})
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        connection = self._connection()
+        connection.executescript(self.SCHEMA)
+        # id is the INTEGER PRIMARY KEY, i.e. the rowid, so it needs no index of its own.
+        self.columns = frozenset(row[1] for row in connection.execute("PRAGMA table_info(todos)"))
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def _column(self, name):
+        """Quotes a column name after checking it exists; names come from clients."""
+        if name not in self.columns:
+            raise ValueError(f"Unknown column '{name}'")
+        return f'"{name}"'
+
+    def _row(self, row):
+        return {key: bool(row[key]) if key in self.BOOLEAN_COLUMNS and row[key] is not None else row[key]
+                for key in row.keys()}
+
+    def _query(self, sql, params=()):
+        return [self._row(row) for row in self._connection().execute(sql, params).fetchall()]
+
+    def _select_list(self, options):
+        if options["select"] == "*":
+            return "*"
+        return ", ".join(self._column(column) for column in options["select"].split(","))
+
+    def _where(self, filters, ids=None):
+        clauses, params = [], []
+        if ids is not None:
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})" if ids else "0")
+            params.extend(ids)
+        for column, value in filters.items():
+            clauses.append(f"{self._column(column)} = ?")
+            params.append(value)
+        return clauses, params
+
+    def _assignments(self, data):
+        return ", ".join(f"{self._column(column)} = ?" for column in data), list(data.values())
+
+    def insert(self, records):
+        connection = self._connection()
+        created = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for record in records:
+                columns = ", ".join(self._column(column) for column in record)
+                placeholders = ", ".join("?" * len(record))
+                row = connection.execute(
+                    f"INSERT INTO todos ({columns}) VALUES ({placeholders}) RETURNING *", list(record.values())
+                ).fetchone()
+                created.append(self._row(row))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return created
+
+    def page(self, limit, after=None, options=DEFAULT_TODO_QUERY):
+        clauses, params = self._where(options["filters"])
+        column, descending = options["order"], options["descending"]
+        if column == "id":
+            order = "id DESC" if descending else "id"
+            if after is not None:
+                clauses.append("id < ?" if descending else "id > ?")
+                params.append(after)
+        else:
+            quoted = self._column(column)
+            # Postgres' default null placement, which split_page cursors assume.
+            order = f"{quoted} DESC NULLS FIRST, id" if descending else f"{quoted} ASC NULLS LAST, id"
+            if after is not None:
+                clause, after_params = _after_clause(quoted, descending, *after)
+                clauses.append(clause)
+                params.extend(after_params)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT {self._select_list(options)} FROM todos{where} ORDER BY {order} LIMIT ?",
+            params + [limit + 1],
+        )
+        return split_page(rows, limit, options)
+
+    def get(self, todo_id, options=DEFAULT_TODO_QUERY):
+        clauses, params = self._where(options["filters"])
+        clauses.insert(0, "id = ?")
+        params.insert(0, todo_id)
+        rows = self._query(f"SELECT {self._select_list(options)} FROM todos WHERE {' AND '.join(clauses)}", params)
+        return rows[0] if rows else None
+
+    def update(self, todo_id, data):
+        assignments, params = self._assignments(data)
+        rows = self._query(f"UPDATE todos SET {assignments} WHERE id = ? RETURNING *", params + [todo_id])
+        return rows[0] if rows else None
+
+    def delete(self, todo_id):
+        rows = self._query("DELETE FROM todos WHERE id = ? RETURNING *", [todo_id])
+        return rows[0] if rows else None
+
+    def update_where(self, data, selection):
+        assignments, params = self._assignments(data)
+        clauses, where_params = self._where(selection["filters"], selection["ids"])
+        return self._query(
+            f"UPDATE todos SET {assignments} WHERE {' AND '.join(clauses)} RETURNING *", params + where_params
+        )
+
+    def delete_where(self, selection):
+        clauses, params = self._where(selection["filters"], selection["ids"])
+        return self._query(f"DELETE FROM todos WHERE {' AND '.join(clauses)} RETURNING *", params)
+
+    def ping(self):
+        self._connection().execute("SELECT id FROM todos LIMIT 1").fetchall()
+
+
+def _after_clause(column, descending, value, last_id):
+    """SQL twin of todo_queries.after_filter, for a quoted column."""
+    if value is None:
+        same_value = f"({column} IS NULL AND id > ?)"
+        return (f"({column} IS NOT NULL OR {same_value})" if descending else same_value), [last_id]
+    same_value = f"({column} = ? AND id > ?)"
+    if descending:
+        return f"({column} < ? OR {same_value})", [value, value, last_id]
+    return f"({column} > ? OR {column} IS NULL OR {same_value})", [value, value, last_id]
+
+
+class GuardedTodoRepository(TodoRepository):
+    """
+    Runs every call of another repository through a circuit_breaker.CircuitBreaker,
+    so calls fail fast with CircuitOpen while the backend is unhealthy. Reads,
+    being idempotent, are retried with jittered backoff; writes never are.
+    """
+
+    def __init__(self, repository, breaker, read_retries=2, retry_base_delay=0.05):
+        self.repository = repository
+        self.breaker = breaker
+        self.read_retries = read_retries
+        self.retry_base_delay = retry_base_delay
+
+    def _read(self, fn, *args):
+        return self.breaker.call_with_retries(fn, *args, retries=self.read_retries, base_delay=self.retry_base_delay)
+
+    def insert(self, records):
+        return self.breaker.call(self.repository.insert, records)
+
+    def page(self, limit, after=None, options=DEFAULT_TODO_QUERY):
+        return self._read(self.repository.page, limit, after, options)
+
+    def get(self, todo_id, options=DEFAULT_TODO_QUERY):
+        return self._read(self.repository.get, todo_id, options)
+
+    def update(self, todo_id, data):
+        return self.breaker.call(self.repository.update, todo_id, data)
+
+    def delete(self, todo_id):
+        return self.breaker.call(self.repository.delete, todo_id)
+
+    def update_where(self, data, selection):
+        return self.breaker.call(self.repository.update_where, data, selection)
+
+    def delete_where(self, selection):
+        return self.breaker.call(self.repository.delete_where, selection)
+
+    def ping(self):
+        # Health checks report the backend itself, whatever the breaker thinks.
+        self.repository.ping()
@@ -0,0 +1,65 @@
+"""Read cache and response building for the todo API, shared by its sync and async variants.
+
+Nothing here depends on Flask or Quart: functions take the app and request
+where a response is built, and error answers are returned as (payload,
+status) tuples, which both frameworks encode with the app's JSON provider.
+"""
+import os
+
+from response_cache import ResultCache, content_etag
+from todo_queries import is_client_error
+
+
+def create_todo_cache():
+    """
+    Builds the cache of encoded GET responses from the TODO_CACHE_* settings.
+    Each worker process has its own cache, so the TTL bounds how long a write
+    made through another worker can go unnoticed. A TTL of 0 (or less)
+    disables the cache rather than expiry.
+    """
+    max_entries = int(os.getenv("TODO_CACHE_MAX_ENTRIES", "1024"))
+    max_bytes = int(os.getenv("TODO_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    ttl = float(os.getenv("TODO_CACHE_TTL", "5"))
+    return ResultCache(
+        max_entries=max_entries if ttl > 0 else 0,
+        max_bytes=max_bytes,
+        ttl=ttl if ttl > 0 else None,
+    )
+
+
+def invalidate_todos(cache, *todo_ids):
+    """Drops every cached listing, plus the cached reads of the given todos."""
+    todo_ids = set(todo_ids)
+    cache.discard_where(
+        lambda key: key[0] == "todos" or (key[0] == "todo" and key[1] in todo_ids)
+    )
+
+
+def cache_payload(app, cache, key, generation, payload):
+    """
+    Encodes payload and caches the body with its ETag, unless the cache was
+    invalidated since generation was read. Returns (body, etag).
+    """
+    body = app.json.response_bytes(payload)
+    etag = content_etag(body)
+    cache.set(key, body, generation, etag)
+    return body, etag
+
+
+def conditional_response(app, request, body, etag):
+    """Answers with the body, or with 304 if the request's If-None-Match matches etag."""
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype=app.json.mimetype)
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate it before every use.
+    response.cache_control.no_cache = True
+    return response
+
+
+def store_error(context, e):
+    """Answers a failed store call: 400 if the request itself was rejected, else 500."""
+    if is_client_error(e):
+        return {"error": f"Invalid request: {getattr(e, 'message', None) or str(e)}"}, 400
+    return {"error": f"{context}: {str(e)}"}, 500
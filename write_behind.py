@@ -0,0 +1,268 @@
+"""Write-behind buffer: accept records now, insert them upstream in batches later.
+
+Records are appended to a local spill log before they are acknowledged, so a
+crash between acknowledgement and flush doesn't lose them. Flushed records
+are marked in the log by an appended line rather than by rewriting it; the
+log is compacted once most of it is settled. Each process writes its own log,
+named after its pid and a random token, and on startup a process adopts the
+logs of processes that are no longer running (including an earlier process
+that had the same pid) and re-queues their records.
+
+A failed insert is retried later when it looks like an outage. When the store
+rejects the batch itself, the batch is split to find the offending records,
+which are moved to a dead-letter file so they can't block the queue.
+
+Delivery is at-least-once. If an insert succeeds but its response is lost,
+the batch is retried and may be stored twice.
+"""
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+_SPILL_NAME = re.compile(r"spill-(\d+)(?:-([0-9a-f]+))?(?:-.*)?\.jsonl")
+
+
+class QueueFull(Exception):
+    """Raised by add() while max_pending records are waiting to be flushed."""
+
+
+class WriteBehindBuffer:
+    """Queues records and flushes them with insert_many every interval or batch_size records."""
+
+    # Log lines beyond twice the pending records that trigger a compaction.
+    COMPACT_SLACK = 1000
+
+    def __init__(self, insert_many, spill_dir, batch_size=100, interval=0.05, on_flush=None,
+                 max_pending=10000, is_outage=None):
+        self.insert_many = insert_many
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_flush = on_flush
+        self.max_pending = max_pending
+        # Whether a failed insert should be retried later; anything else means
+        # the store rejected the records themselves.
+        self.is_outage = is_outage or (lambda exc: True)
+        self.flushed = self.failed_flushes = self.dead_lettered = self.refused = 0
+        self._forget()
+        os.register_at_fork(after_in_child=self._forget)
+
+    def _forget(self):
+        # A forked child starts empty: records inherited from the parent are
+        # still in the parent's queue and spill log, and are its to flush.
+        self._pending = []  # [(provisional_id, record)], oldest first
+        self._log_lines = 0
+        self._token = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def spill_path(self):
+        return os.path.join(self.spill_dir, f"spill-{os.getpid()}-{self._token}.jsonl")
+
+    @property
+    def dead_letter_path(self):
+        return os.path.join(self.spill_dir, "dead-letter.jsonl")
+
+    def _start(self):
+        """Adopts orphaned spill logs and starts the flusher. Caller holds _lock."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._adopt_orphans()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def _is_orphan(self, path):
+        match = _SPILL_NAME.fullmatch(os.path.basename(path))
+        if match is None:
+            return False
+        pid, token = int(match.group(1)), match.group(2)
+        if pid == os.getpid():
+            # Ours, or left by an earlier process that had the same pid.
+            return token != self._token
+        return not _process_alive(pid)
+
+    def _adopt_orphans(self):
+        for path in glob.glob(os.path.join(self.spill_dir, "spill-*.jsonl")):
+            if not self._is_orphan(path):
+                continue
+            # Named like our own log, so it is adopted again if we crash before removing it.
+            claimed = f"{self.spill_path[:-len('.jsonl')]}-claimed-{uuid.uuid4().hex[:8]}.jsonl"
+            try:
+                os.rename(path, claimed)  # atomic: only one process wins
+            except OSError:
+                continue
+            entries = list(_read_spill(claimed).items())
+            self._append([_record_line(provisional_id, record) for provisional_id, record in entries])
+            self._pending.extend(entries)
+            os.remove(claimed)
+
+    def _append(self, lines):
+        """Durably appends lines to this process's spill log. Caller holds _lock."""
+        if not lines:
+            return
+        with open(self.spill_path, "a") as spill:
+            spill.write("".join(lines))
+            spill.flush()
+            os.fsync(spill.fileno())
+        self._log_lines += len(lines)
+
+    def add(self, record):
+        """Durably queues record and returns its provisional id; raises QueueFull when full."""
+        with self._lock:
+            self._start()
+            if len(self._pending) >= self.max_pending:
+                self.refused += 1
+                raise QueueFull(f"{len(self._pending)} records are waiting to be flushed")
+            provisional_id = uuid.uuid4().hex
+            self._append([_record_line(provisional_id, record)])
+            self._pending.append((provisional_id, record))
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+            return provisional_id
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(lambda: len(self._pending) >= self.batch_size, timeout=self.interval)
+            try:
+                self.flush()
+            except Exception:
+                # E.g. a full disk while settling, or an on_flush error: the
+                # records are still queued, so keep the flusher alive and retry.
+                self.failed_flushes += 1
+                time.sleep(self.interval)
+
+    def flush(self):
+        """
+        Inserts queued records in batches until the queue is empty or an insert
+        fails with an outage. A rejected batch is halved until the rejected
+        records are isolated and dead-lettered.
+        """
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    chunks = [self._pending[:self.batch_size]]
+                if not chunks[0]:
+                    return
+                # Chunks are settled in queue order, so each one is at the front of _pending.
+                while chunks:
+                    chunk = chunks.pop(0)
+                    inserted = False
+                    try:
+                        self.insert_many([record for _, record in chunk])
+                        inserted = True
+                    except Exception as exc:
+                        if self.is_outage(exc):
+                            # Keep the chunk queued (and spilled); retry on the next tick.
+                            self.failed_flushes += 1
+                            time.sleep(self.interval)
+                            return
+                        if len(chunk) > 1:
+                            middle = len(chunk) // 2
+                            chunks[:0] = [chunk[:middle], chunk[middle:]]
+                            continue
+                        self._dead_letter(chunk[0], exc)
+                    self._settle(chunk)
+                    if inserted:
+                        # Only after settling: an on_flush error mustn't get the chunk inserted twice.
+                        self.flushed += len(chunk)
+                        if self.on_flush:
+                            self.on_flush()
+                self._compact_if_needed()
+
+    def _settle(self, chunk):
+        """Drops a chunk from the front of the queue and marks it flushed in the spill log."""
+        with self._lock:
+            del self._pending[:len(chunk)]
+            self._append([json.dumps({"flushed": [provisional_id for provisional_id, _ in chunk]}) + "\n"])
+
+    def _dead_letter(self, entry, exc):
+        provisional_id, record = entry
+        line = json.dumps({"provisional_id": provisional_id, "record": record, "error": str(exc)}) + "\n"
+        with open(self.dead_letter_path, "a") as dead_letter:
+            dead_letter.write(line)
+            dead_letter.flush()
+            os.fsync(dead_letter.fileno())
+        self.dead_lettered += 1
+
+    def _compact_if_needed(self):
+        """
+        Rewrites the spill log with only the pending records once settled lines
+        dominate it. The bulk is written without holding _lock, so add() isn't
+        blocked; only records added meanwhile are copied under it. Caller holds
+        _flush_lock, so nothing leaves the queue meanwhile.
+        """
+        with self._lock:
+            if self._log_lines < 2 * len(self._pending) + self.COMPACT_SLACK:
+                return
+            snapshot = list(self._pending)
+        temporary = self.spill_path + ".tmp"
+        with open(temporary, "w") as spill:
+            spill.write("".join(_record_line(provisional_id, record) for provisional_id, record in snapshot))
+            with self._lock:
+                added = self._pending[len(snapshot):]
+                spill.write("".join(_record_line(provisional_id, record) for provisional_id, record in added))
+                spill.flush()
+                os.fsync(spill.fileno())
+                os.replace(temporary, self.spill_path)
+                self._log_lines = len(snapshot) + len(added)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "flushed": self.flushed,
+                "failed_flushes": self.failed_flushes,
+                "dead_lettered": self.dead_lettered,
+                "refused": self.refused,
+                "flusher_alive": self._thread is not None and self._thread.is_alive(),
+                "batch_size": self.batch_size,
+                "interval_ms": self.interval * 1000,
+            }
+
+
+def _record_line(provisional_id, record):
+    return json.dumps({"provisional_id": provisional_id, "record": record}) + "\n"
+
+
+def _read_spill(path):
+    """
+    Returns the records of a spill log that were never marked flushed, oldest
+    first. A line cut short by a crash mid-append is skipped.
+    """
+    pending = {}
+    with open(path) as spill:
+        for line in spill:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "flushed" in entry:
+                for provisional_id in entry["flushed"]:
+                    pending.pop(provisional_id, None)
+            else:
+                pending[entry["provisional_id"]] = entry["record"]
+    return pending
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True